@@ -9,11 +9,10 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 import numpy as np
 import pandas as pd
-from sklearn.metrics.pairwise import cosine_similarity
 
 from models.embedding_model import EmbeddingModel
 from matching.text_processor import create_provider_text, create_client_request_text, create_need_text
-from utils.ner_extractor import NERExtractor
+from utils.ner_extractor import NERExtractor, REQUIRED_DISPO_MASKS, build_dispo_mask
 
 
 class ProviderMatcher:
@@ -73,10 +72,10 @@ class ProviderMatcher:
         print(f">> Embeddings créés: shape {self.provider_embeddings.shape}")
         return self.provider_embeddings
     
-    def find_matches(self, client_request, top_k=5, threshold=0.3, ner_entities=None, impact_geo=1, apply_domain_filter=True):
+    def find_matches(self, client_request, top_k=5, threshold=0.3, ner_entities=None, impact_geo=1, apply_domain_filter=True, _request_similarities=None):
         """
         Trouve les meilleurs prestataires pour une demande client
-        
+
         Args:
             client_request: Texte ou dict de la demande client
             top_k: Nombre de résultats à retourner
@@ -84,7 +83,9 @@ class ProviderMatcher:
             ner_entities: Entités NER extraites (optionnel, calculées auto si None)
             impact_geo: Niveau d'impact géographique (0, 1, 2) - par défaut 1
             apply_domain_filter: Filtrer par domaines d'expertise (True par défaut)
-        
+            _request_similarities: Similarités pré-calculées contre TOUS les
+                                   prestataires (usage interne, voir match_needs_batch)
+
         Returns:
             pandas.DataFrame: Meilleurs prestataires avec leurs scores
         """
@@ -120,6 +121,7 @@ class ProviderMatcher:
         else:
             filtered_df = self.providers_df.copy()
             filtered_embeddings = self.provider_embeddings
+            filtered_indices = None
         
         # Extraire entités NER si besoin
         if self.use_ner and ner_entities is None:
@@ -129,11 +131,18 @@ class ProviderMatcher:
                 message = client_request.get('message', '') or client_request.get('description', '')
                 ner_entities = self.ner_extractor.extract_all(message)
         
-        # Générer l'embedding de la requête
-        request_embedding = self.embedding_model.encode([request_text], show_progress=False)
-        
-        # Calculer les similarités cosinus sur prestataires filtrés
-        similarities = cosine_similarity(request_embedding, filtered_embeddings)[0]
+        if _request_similarities is not None:
+            # Similarités déjà calculées en batch (un seul produit matriciel pour N besoins)
+            if filtered_indices is not None:
+                similarities = _request_similarities[filtered_indices]
+            else:
+                similarities = _request_similarities
+        else:
+            # Générer l'embedding de la requête (normalisé L2)
+            request_embedding = self.embedding_model.encode([request_text], show_progress=False)
+
+            # Embeddings normalisés → similarité cosinus = produit scalaire
+            similarities = (request_embedding @ filtered_embeddings.T)[0]
         
         # Ajouter les scores au DataFrame filtré
         results = filtered_df.copy()
@@ -371,12 +380,14 @@ class ProviderMatcher:
         contraintes = ner_entities.get('contraintes_matching', {})
         contrainte_dispo = contraintes.get('disponibilite', 'ALL')
         
-        # Filtrage par disponibilité
+        # Filtrage par disponibilité: bitmasks de capacités (mémoïsés par
+        # libellé) puis un seul AND NumPy sur toute la colonne, au lieu
+        # d'un appel Python de compatibilité par prestataire
         if contrainte_dispo != 'ALL' and 'Disponibilite' in results.columns:
-            mask_compatible = results['Disponibilite'].apply(
-                lambda x: self.ner_extractor.is_compatible_disponibilite(x, contrainte_dispo)
-            )
-            results = results[mask_compatible]
+            required = REQUIRED_DISPO_MASKS.get(contrainte_dispo)
+            if required is not None:
+                cap_masks = results['Disponibilite'].map(build_dispo_mask).to_numpy(dtype=np.int64)
+                results = results[(cap_masks & required) != 0]
         
         return results
     
@@ -407,11 +418,10 @@ class ProviderMatcher:
         weights = ADAPTIVE_WEIGHTS.get(impact_geo, {'semantic': 0.7, 'geo': 0.3})
         
         if 'Ville' in results.columns and ville_besoin:
-            # Calculer le score géographique
-            geo_scores = results['Ville'].apply(
-                lambda x: self.ner_extractor.calculate_geo_score(
-                    ville_besoin, x, impact_geo
-                )
+            # Calcul vectorisé: un score par ville UNIQUE puis gather NumPy,
+            # au lieu d'un appel Python par ligne via .apply
+            geo_scores = self.ner_extractor.calculate_geo_scores_batch(
+                ville_besoin, results['Ville'].to_numpy(), impact_geo
             )
             results['geo_score'] = geo_scores
             
@@ -671,13 +681,11 @@ class ProviderMatcher:
         ville_besoin = ner_entities.get('ville_detectee')
         
         if 'Ville' in results.columns:
-            # Calculer le score géographique pour chaque prestataire
-            geo_scores = results['Ville'].apply(
-                lambda x: self.ner_extractor.calculate_geo_score(
-                    ville_besoin, x, impact_geo
-                )
+            # Calcul vectorisé du score géographique (une fois par ville unique)
+            geo_scores = self.ner_extractor.calculate_geo_scores_batch(
+                ville_besoin, results['Ville'].to_numpy(), impact_geo
             )
-            
+
             # Stocker le score géographique
             results['geo_score'] = geo_scores
             
@@ -733,21 +741,18 @@ class ProviderMatcher:
         
         return results
     
-    def match_need_row(self, need_row, top_k=3, threshold=0.3, apply_domain_filter=True):
+    @staticmethod
+    def _need_row_to_dict(need_row):
         """
-        Trouve les prestataires pour un besoin du CSV
-        
+        Convertit une ligne du CSV besoins en dict pour find_matches
+
         Args:
             need_row: pandas.Series représentant une ligne du CSV besoins
-            top_k: Nombre de résultats
-            threshold: Score minimum
-            apply_domain_filter: Filtrer par domaines (True par défaut)
-        
+
         Returns:
-            pandas.DataFrame: Meilleurs prestataires
+            dict: Demande client complète (message, catégorie, contraintes...)
         """
-        # Créer un dict complet pour find_matches (pas juste le texte)
-        need_dict = {
+        return {
             'message': need_row.get('Message_Utilisateur', ''),
             'categorie': need_row.get('Categorie_Majeure'),
             'service': need_row.get('Sous_Categorie'),
@@ -755,38 +760,94 @@ class ProviderMatcher:
             'ville': need_row.get('Ville_Detectee') if 'Ville_Detectee' in need_row else None,
             'disponibilite': need_row.get('Contrainte_Disponibilite') if 'Contrainte_Disponibilite' in need_row else None
         }
-        
+
+    def match_need_row(self, need_row, top_k=3, threshold=0.3, apply_domain_filter=True, _request_similarities=None):
+        """
+        Trouve les prestataires pour un besoin du CSV
+
+        Args:
+            need_row: pandas.Series représentant une ligne du CSV besoins
+            top_k: Nombre de résultats
+            threshold: Score minimum
+            apply_domain_filter: Filtrer par domaines (True par défaut)
+            _request_similarities: Similarités pré-calculées (usage interne)
+
+        Returns:
+            pandas.DataFrame: Meilleurs prestataires
+        """
+        # Créer un dict complet pour find_matches (pas juste le texte)
+        need_dict = self._need_row_to_dict(need_row)
+
         # Récupérer impact_geo depuis la colonne si disponible
         impact_geo = int(need_row.get('Impact_Geo', 1))  # Par défaut 1 si absent
-        
+
         return self.find_matches(
             need_dict,  # Passer le dict complet, pas juste le texte
-            top_k=top_k, 
-            threshold=threshold, 
+            top_k=top_k,
+            threshold=threshold,
             impact_geo=impact_geo,
-            apply_domain_filter=apply_domain_filter
+            apply_domain_filter=apply_domain_filter,
+            _request_similarities=_request_similarities
         )
-    
+
+    def match_needs_batch(self, needs_df, top_k=3, threshold=0.3, apply_domain_filter=True):
+        """
+        Fait le matching pour N besoins avec un seul produit matriciel
+
+        Au lieu de N appels encode + N produits (1 × d) · (d × M), encode
+        toutes les requêtes en un batch et calcule les similarités en un
+        seul gemm (N × d) · (d × M) — même résultat, moins de passes mémoire
+        sur la matrice des prestataires.
+
+        Args:
+            needs_df: DataFrame contenant les besoins
+            top_k: Nombre de résultats par besoin
+            threshold: Score minimum
+            apply_domain_filter: Filtrer par domaines (True par défaut)
+
+        Returns:
+            list: Liste de tuples (index_besoin, DataFrame_matches)
+        """
+        if self.provider_embeddings is None:
+            raise ValueError("Vous devez d'abord générer les embeddings avec encode_providers()")
+
+        # Encoder toutes les requêtes en un seul batch
+        request_texts = [
+            create_client_request_text(self._need_row_to_dict(need_row))
+            for _, need_row in needs_df.iterrows()
+        ]
+        request_embeddings = self.embedding_model.encode(request_texts, show_progress=False)
+
+        # Embeddings normalisés → un seul produit matriciel donne les N × M similarités
+        all_similarities = request_embeddings @ self.provider_embeddings.T
+
+        results = []
+        for (idx, need_row), similarities in zip(needs_df.iterrows(), all_similarities):
+            matches = self.match_need_row(
+                need_row, top_k=top_k, threshold=threshold,
+                apply_domain_filter=apply_domain_filter,
+                _request_similarities=similarities
+            )
+            results.append((idx, matches))
+
+        return results
+
     def batch_match(self, needs_df, top_k=3, threshold=0.3):
         """
         Fait le matching pour plusieurs besoins en batch
-        
+
         Args:
             needs_df: DataFrame contenant les besoins
             top_k: Nombre de résultats par besoin
             threshold: Score minimum
-        
+
         Returns:
             list: Liste de tuples (index_besoin, DataFrame_matches)
         """
-        results = []
-        
         print(f"\nMatching en batch pour {len(needs_df)} besoins...")
-        
-        for idx, need_row in needs_df.iterrows():
-            matches = self.match_need_row(need_row, top_k=top_k, threshold=threshold)
-            results.append((idx, matches))
-        
+
+        results = self.match_needs_batch(needs_df, top_k=top_k, threshold=threshold)
+
         print(f">> Batch matching terminé: {len(results)} besoins traités")
         return results
     
@@ -30,28 +30,31 @@ class EmbeddingModel:
         self.model = SentenceTransformer(self.model_name)
         print(f">> Modèle {self.model_name} chargé avec succès")
     
-    def encode(self, texts, show_progress=True, batch_size=32):
+    def encode(self, texts, show_progress=True, batch_size=32, normalize=True):
         """
         Génère des embeddings pour une liste de textes
-        
+
         Args:
             texts: Liste de textes à encoder (str ou list of str)
             show_progress: Afficher une barre de progression
             batch_size: Taille des batchs pour le traitement
-        
+            normalize: Normaliser L2 les embeddings (la similarité cosinus
+                       devient alors un simple produit scalaire)
+
         Returns:
             numpy.ndarray: Matrice d'embeddings (n_texts, embedding_dim)
         """
         if isinstance(texts, str):
             texts = [texts]
-        
+
         embeddings = self.model.encode(
             texts,
             show_progress_bar=show_progress,
             batch_size=batch_size,
-            convert_to_numpy=True
+            convert_to_numpy=True,
+            normalize_embeddings=normalize
         )
-        
+
         return embeddings
     
     def encode_single(self, text):
@@ -0,0 +1,192 @@
+"""
+Coeur commun d'enrichissement NER des besoins
+Partagé par enrichir_besoins_ner.py et enrichir_besoins_v2_ner.py
+
+Centralise la boucle d'extraction et les I/O pour que les optimisations
+(batching, écriture bufferisée, etc.) ne soient implémentées qu'une fois.
+"""
+
+import sys
+import json
+from pathlib import Path
+import pandas as pd
+
+# Essayer d'importer orjson (sérialisation JSON en C, ~5-10x plus rapide)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Ajouter le dossier parent au path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.ner_extractor import NERExtractor
+
+# Mapping colonne enrichie -> clé des entités extraites
+ENRICHED_COLUMNS = {
+    'Ville_Detectee': 'ville_detectee',
+    'Date_Detectee': 'date_detectee',
+    'Horizon_Temporel_Normalise': 'horizon_temporel',
+    'Jours_Estimation': 'jours_estimation',
+    'Urgence_Deduite': 'urgence_deduite',
+}
+
+
+def extract_entities(besoins_df, verbose_examples=5):
+    """
+    Extrait les entités NER pour chaque besoin du DataFrame
+
+    Args:
+        besoins_df: DataFrame des besoins (colonnes Message_Utilisateur, etc.)
+        verbose_examples: Nombre d'exemples à afficher pendant l'extraction
+
+    Returns:
+        pandas.DataFrame: Une ligne d'entités par besoin
+    """
+    ner = NERExtractor()
+
+    print("\n>> Extraction des entités NER...")
+
+    entities_list = []
+    for idx, row in besoins_df.iterrows():
+        message = row['Message_Utilisateur']
+        niveau_urgence = row.get('Niveau_Urgence', None)
+
+        # Extraction complète
+        entities = ner.extract_all(message, niveau_urgence)
+        entities['besoin_id'] = idx
+        entities_list.append(entities)
+
+        # Afficher quelques exemples
+        if idx < verbose_examples:
+            print(f"\n   Besoin #{idx}: {row['Sous_Categorie']}")
+            print(f"   Message: {message[:80]}...")
+            print(f"   -> Ville: {entities['ville_detectee']}")
+            print(f"   -> Horizon: {entities['horizon_temporel']}")
+            print(f"   -> Urgence: {entities['urgence_deduite']}")
+            print(f"   -> Contraintes: {entities['contraintes_matching']}")
+
+    return pd.DataFrame(entities_list)
+
+
+def build_enriched_df(besoins_df, entities_df):
+    """
+    Fusionne les entités extraites avec le DataFrame des besoins originaux
+
+    Args:
+        besoins_df: DataFrame des besoins originaux
+        entities_df: DataFrame des entités (une ligne par besoin)
+
+    Returns:
+        pandas.DataFrame: Besoins enrichis des colonnes NER
+    """
+    besoins_enrichis = besoins_df.copy()
+
+    for col, key in ENRICHED_COLUMNS.items():
+        besoins_enrichis[col] = entities_df[key]
+
+    besoins_enrichis['Contrainte_Ville'] = entities_df['contraintes_matching'].apply(lambda x: x['ville'])
+    besoins_enrichis['Contrainte_Disponibilite'] = entities_df['contraintes_matching'].apply(lambda x: x['disponibilite'])
+
+    return besoins_enrichis
+
+
+def save_enriched_json(besoins_enrichis, output_json):
+    """
+    Sauvegarde les besoins enrichis en JSON pour inspection détaillée
+
+    Args:
+        besoins_enrichis: DataFrame des besoins enrichis
+        output_json: Chemin du fichier JSON de sortie
+    """
+    json_records = []
+    for idx, row in besoins_enrichis.iterrows():
+        record = {
+            'besoin_id': int(idx),
+            'categorie_majeure': row['Categorie_Majeure'],
+            'sous_categorie': row['Sous_Categorie'],
+            'message_utilisateur': row['Message_Utilisateur'],
+            'niveau_urgence_original': row['Niveau_Urgence'],
+            'entites_ner': {
+                'ville_detectee': row['Ville_Detectee'] if pd.notna(row['Ville_Detectee']) else None,
+                'date_detectee': row['Date_Detectee'] if pd.notna(row['Date_Detectee']) else None,
+                'horizon_temporel': row['Horizon_Temporel_Normalise'] if pd.notna(row['Horizon_Temporel_Normalise']) else None,
+                'jours_estimation': int(row['Jours_Estimation']) if pd.notna(row['Jours_Estimation']) else None,
+                'urgence_deduite': row['Urgence_Deduite']
+            },
+            'contraintes_matching': {
+                'ville': row['Contrainte_Ville'],
+                'disponibilite': row['Contrainte_Disponibilite']
+            }
+        }
+        json_records.append(record)
+
+    output_json = Path(output_json)
+    if ORJSON_AVAILABLE:
+        # Sérialisation C-level + écriture directe en bytes UTF-8 (pas de ré-encodage)
+        output_json.write_bytes(
+            orjson.dumps(json_records, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        )
+    else:
+        with open(output_json, 'w', encoding='utf-8') as f:
+            json.dump(json_records, f, ensure_ascii=False, indent=2)
+
+    print(f">> Fichier JSON sauvegardé: {output_json}")
+
+
+def display_enrichment_stats(besoins_enrichis):
+    """
+    Affiche les statistiques sur les entités détectées
+    """
+    print(f"\nBesoins avec ville détectée: {besoins_enrichis['Ville_Detectee'].notna().sum()}/{len(besoins_enrichis)}")
+    print(f"Besoins avec date détectée: {besoins_enrichis['Date_Detectee'].notna().sum()}/{len(besoins_enrichis)}")
+    print(f"Besoins avec horizon normalisé: {besoins_enrichis['Horizon_Temporel_Normalise'].notna().sum()}/{len(besoins_enrichis)}")
+
+    print("\nRépartition par urgence déduite:")
+    print(besoins_enrichis['Urgence_Deduite'].value_counts())
+
+    print("\nRépartition par horizon temporel:")
+    print(besoins_enrichis['Horizon_Temporel_Normalise'].value_counts())
+
+    print("\nTop 5 villes détectées:")
+    print(besoins_enrichis['Ville_Detectee'].value_counts().head())
+
+
+def enrich_needs(besoins_df, output_csv, output_json=None, csv_encoding='utf-8-sig', verbose_examples=5):
+    """
+    Pipeline complet d'enrichissement: extraction NER, fusion, sauvegarde
+
+    Args:
+        besoins_df: DataFrame des besoins à enrichir
+        output_csv: Chemin du fichier CSV enrichi
+        output_json: Chemin du fichier JSON (optionnel)
+        csv_encoding: Encodage du CSV de sortie
+        verbose_examples: Nombre d'exemples à afficher pendant l'extraction
+
+    Returns:
+        pandas.DataFrame: Besoins enrichis
+    """
+    # 1. Extraire les entités pour chaque besoin
+    entities_df = extract_entities(besoins_df, verbose_examples=verbose_examples)
+
+    # 2. Fusionner avec les besoins originaux
+    besoins_enrichis = build_enriched_df(besoins_df, entities_df)
+
+    # 3. Sauvegarder le fichier enrichi
+    output_csv = Path(output_csv)
+    besoins_enrichis.to_csv(output_csv, index=False, sep=';', encoding=csv_encoding)
+
+    print(f"\n{'='*80}")
+    print("RÉSUMÉ DE L'ENRICHISSEMENT")
+    print(f"{'='*80}")
+
+    display_enrichment_stats(besoins_enrichis)
+
+    print(f"\n>> Fichier enrichi sauvegardé: {output_csv}")
+
+    # 4. Sauvegarder aussi en JSON pour inspection détaillée
+    if output_json is not None:
+        save_enriched_json(besoins_enrichis, output_json)
+
+    return besoins_enrichis
@@ -6,6 +6,8 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
+import pandas as pd
+
 from matching import ProviderMatcher
 from utils import load_providers, load_needs
 from config import PRESTATAIRES_CSV, BESOINS_ENRICHIS_CSV
@@ -27,19 +29,29 @@ def test_domain_filter():
     
     print(f"\n>> {len(providers_df)} prestataires chargés\n")
     
-    # 2. Charger un besoin
+    # 2. Charger les besoins de test
     needs_df = load_needs(BESOINS_ENRICHIS_CSV)
-    
+
+    besoin = needs_df[needs_df['Sous_Categorie'] == "Garde d'enfant"].iloc[0]
+    besoin2 = needs_df[needs_df['Sous_Categorie'] == "Prêt immobilier"].iloc[0]
+    besoin3 = needs_df[needs_df['Sous_Categorie'] == "Réparation urgente"].iloc[0]
+
+    # Matcher les 3 besoins en batch: un seul produit matriciel par mode
+    # au lieu de 3 appels match_need_row séparés
+    besoins_batch = pd.DataFrame([besoin, besoin2, besoin3])
+    batch_sans = matcher.match_needs_batch(besoins_batch, top_k=5, apply_domain_filter=False)
+    batch_avec = matcher.match_needs_batch(besoins_batch, top_k=5, apply_domain_filter=True)
+    results_no_filter, results_no_filter2, results_no_filter3 = (m for _, m in batch_sans)
+    results_with_filter, results_with_filter2, results_with_filter3 = (m for _, m in batch_avec)
+
     # Test 1: Garde d'enfant
     print("="*80)
     print("TEST 1: Garde d'enfant à Paris")
     print("="*80)
-    
-    besoin = needs_df[needs_df['Sous_Categorie'] == "Garde d'enfant"].iloc[0]
+
     print(f"Besoin: {besoin['Message_Utilisateur'][:80]}...")
-    
+
     print("\n▸ SANS filtre domaines:")
-    results_no_filter = matcher.match_need_row(besoin, top_k=5, apply_domain_filter=False)
     print(f"  {len(results_no_filter)} résultats")
     if len(results_no_filter) > 0:
         print(f"  Meilleur score: {results_no_filter.iloc[0]['similarity_score']:.4f}")
@@ -48,7 +60,6 @@ def test_domain_filter():
             print(f"    {i+1}. {row['Nom_Entreprise']:30s} | {row['Domaines_Expertise']:40s} | Score: {row['similarity_score']:.4f}")
     
     print("\n▸ AVEC filtre domaines:")
-    results_with_filter = matcher.match_need_row(besoin, top_k=5, apply_domain_filter=True)
     print(f"  {len(results_with_filter)} résultats")
     if len(results_with_filter) > 0:
         print(f"  Meilleur score: {results_with_filter.iloc[0]['similarity_score']:.4f}")
@@ -61,11 +72,9 @@ def test_domain_filter():
     print("TEST 2: Prêt immobilier à Marseille")
     print("="*80)
     
-    besoin2 = needs_df[needs_df['Sous_Categorie'] == "Prêt immobilier"].iloc[0]
     print(f"Besoin: {besoin2['Message_Utilisateur'][:80]}...")
-    
+
     print("\n▸ SANS filtre domaines:")
-    results_no_filter2 = matcher.match_need_row(besoin2, top_k=5, apply_domain_filter=False)
     print(f"  {len(results_no_filter2)} résultats")
     if len(results_no_filter2) > 0:
         print(f"  Meilleur score: {results_no_filter2.iloc[0]['similarity_score']:.4f}")
@@ -74,7 +83,6 @@ def test_domain_filter():
             print(f"    {i+1}. {row['Nom_Entreprise']:30s} | {row['Domaines_Expertise']:40s} | Score: {row['similarity_score']:.4f}")
     
     print("\n▸ AVEC filtre domaines:")
-    results_with_filter2 = matcher.match_need_row(besoin2, top_k=5, apply_domain_filter=True)
     print(f"  {len(results_with_filter2)} résultats")
     if len(results_with_filter2) > 0:
         print(f"  Meilleur score: {results_with_filter2.iloc[0]['similarity_score']:.4f}")
@@ -87,11 +95,9 @@ def test_domain_filter():
     print("TEST 3: Réparation urgente véhicule à Bourges")
     print("="*80)
     
-    besoin3 = needs_df[needs_df['Sous_Categorie'] == "Réparation urgente"].iloc[0]
     print(f"Besoin: {besoin3['Message_Utilisateur'][:80]}...")
-    
+
     print("\n▸ SANS filtre domaines:")
-    results_no_filter3 = matcher.match_need_row(besoin3, top_k=5, apply_domain_filter=False)
     print(f"  {len(results_no_filter3)} résultats")
     if len(results_no_filter3) > 0:
         print(f"  Meilleur score: {results_no_filter3.iloc[0]['similarity_score']:.4f}")
@@ -100,7 +106,6 @@ def test_domain_filter():
             print(f"    {i+1}. {row['Nom_Entreprise']:30s} | {row['Domaines_Expertise']:40s} | Score: {row['similarity_score']:.4f}")
     
     print("\n▸ AVEC filtre domaines:")
-    results_with_filter3 = matcher.match_need_row(besoin3, top_k=5, apply_domain_filter=True)
     print(f"  {len(results_with_filter3)} résultats")
     if len(results_with_filter3) > 0:
         print(f"  Meilleur score: {results_with_filter3.iloc[0]['similarity_score']:.4f}")
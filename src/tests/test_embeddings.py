@@ -8,9 +8,11 @@ sentences = [
     "C'est une personne très heureuse",
     "Aujourd'hui est une journée ensoleillée"
 ]
-embeddings = model.encode(sentences)
+# Embeddings normalisés en tenseurs: la similarité cosinus devient un simple
+# produit matriciel, sans conversion numpy<->torch ni re-normalisation L2
+embeddings = model.encode(sentences, convert_to_tensor=True, normalize_embeddings=True, batch_size=64)
 
-similarities = model.similarity(embeddings, embeddings)
+similarities = embeddings @ embeddings.T
 print(similarities.shape)
 print(similarities)
-# [4, 4]
\ No newline at end of file
+# [4, 4]
@@ -2,49 +2,174 @@
 Utilitaires pour charger les données CSV
 """
 
+import os
+from functools import lru_cache
+
 import pandas as pd
 from pathlib import Path
 
+# Essayer d'importer pyarrow (cache Parquet + parse CSV multithreadé)
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+# Dtypes explicites: évite l'inférence de type (colonnes object) au parse
+# et réduit la RAM via les chaînes Arrow
+_PROVIDER_DTYPES = {
+    'Nom_Entreprise': 'string[pyarrow]',
+    'Domaines_Expertise': 'string[pyarrow]',
+    'Description_Service': 'string[pyarrow]',
+    'Ville': 'string[pyarrow]',
+    'Disponibilite': 'string[pyarrow]',
+}
+
+_NEEDS_DTYPES = {
+    'Message_Utilisateur': 'string[pyarrow]',
+    'Categorie_Majeure': 'string[pyarrow]',
+    'Sous_Categorie': 'string[pyarrow]',
+    'Niveau_Urgence': 'string[pyarrow]',
+    'Ville': 'string[pyarrow]',
+}
+
+
+def _cached_read(csv_path, dtypes=None):
+    """
+    Lit un CSV avec un cache Parquet transparent
+
+    Au premier chargement, un fichier .parquet est écrit à côté du CSV.
+    Les chargements suivants relisent ce cache binaire (pas de re-parse du
+    CSV) tant que le CSV n'a pas été modifié depuis (comparaison des mtimes).
+
+    Args:
+        csv_path: Chemin (Path) vers le fichier CSV
+        dtypes: Dict colonne -> dtype pour le parse (optionnel, les colonnes
+                absentes du CSV sont ignorées)
+
+    Returns:
+        pandas.DataFrame: Contenu du fichier
+    """
+    if PYARROW_AVAILABLE:
+        cache_path = csv_path.with_suffix('.parquet')
+        if cache_path.exists() and cache_path.stat().st_mtime >= csv_path.stat().st_mtime:
+            return pd.read_parquet(cache_path, engine='pyarrow')
+
+        # Tokenizer Arrow multithreadé + dtypes explicites (pas de boxing object)
+        df = pd.read_csv(csv_path, sep=';', encoding='utf-8', engine='pyarrow', dtype=dtypes)
+    else:
+        df = pd.read_csv(csv_path, sep=';', encoding='utf-8')
+
+    if PYARROW_AVAILABLE:
+        try:
+            df.to_parquet(cache_path, engine='pyarrow', compression='zstd')
+        except (OSError, ValueError):
+            pass  # Cache best-effort (répertoire en lecture seule, types non Arrow...)
+
+    return df
+
+
+def _chunked_read(csv_path, chunksize, dtypes=None):
+    """
+    Lit un CSV par morceaux (mémoire constante quelle que soit sa taille)
 
-def load_providers(csv_path):
+    Args:
+        csv_path: Chemin (Path) vers le fichier CSV
+        chunksize: Nombre de lignes par chunk
+        dtypes: Dict colonne -> dtype (appliqué si pyarrow est disponible)
+
+    Returns:
+        Itérateur de pandas.DataFrame
+    """
+    return pd.read_csv(
+        csv_path, sep=';', encoding='utf-8', engine='c',
+        chunksize=chunksize, dtype=dtypes if PYARROW_AVAILABLE else None
+    )
+
+
+@lru_cache(maxsize=8)
+def _memoized_providers(resolved_path, mtime_ns):
+    """Parse mémoïsé des prestataires (clé: chemin résolu + mtime du CSV)"""
+    df = _cached_read(Path(resolved_path), dtypes=_PROVIDER_DTYPES)
+
+    # Vocabulaire fermé → codes entiers: value_counts passe par un bincount
+    # et la colonne occupe ~1 octet/ligne au lieu d'un pointeur PyObject
+    if 'Disponibilite' in df.columns:
+        df['Disponibilite'] = df['Disponibilite'].astype('category')
+
+    return df
+
+
+@lru_cache(maxsize=8)
+def _memoized_needs(resolved_path, mtime_ns):
+    """Parse mémoïsé des besoins (clé: chemin résolu + mtime du CSV)"""
+    df = _cached_read(Path(resolved_path), dtypes=_NEEDS_DTYPES)
+
+    # Même représentation catégorielle que Disponibilite côté prestataires
+    if 'Niveau_Urgence' in df.columns:
+        df['Niveau_Urgence'] = df['Niveau_Urgence'].astype('category')
+
+    return df
+
+
+def load_providers(csv_path, chunksize=None):
     """
     Charge le fichier CSV des prestataires
-    
+
+    Les appels répétés sur le même fichier (non modifié depuis) retournent
+    le MÊME DataFrame mémoïsé: il doit être traité comme immuable.
+
     Args:
         csv_path: Chemin vers le fichier prestataires.csv
-    
+        chunksize: Si défini, retourne un itérateur de DataFrames de cette
+                   taille au lieu de tout charger en mémoire
+
     Returns:
-        pandas.DataFrame: DataFrame contenant les prestataires
+        pandas.DataFrame (ou itérateur de DataFrames si chunksize est défini)
     """
     csv_path = Path(csv_path)
-    
+
     if not csv_path.exists():
         raise FileNotFoundError(f"Le fichier {csv_path} n'existe pas")
-    
-    df = pd.read_csv(csv_path, sep=';', encoding='utf-8')
+
+    if chunksize:
+        print(f">> Lecture en chunks de {chunksize} lignes depuis {csv_path.name}")
+        return _chunked_read(csv_path, chunksize, dtypes=_PROVIDER_DTYPES)
+
+    df = _memoized_providers(str(csv_path.resolve()), csv_path.stat().st_mtime_ns)
     print(f">> {len(df)} prestataires chargés depuis {csv_path.name}")
-    
+
     return df
 
 
-def load_needs(csv_path):
+def load_needs(csv_path, chunksize=None):
     """
     Charge le fichier CSV des besoins
-    
+
+    Les appels répétés sur le même fichier (non modifié depuis) retournent
+    le MÊME DataFrame mémoïsé: il doit être traité comme immuable.
+
     Args:
         csv_path: Chemin vers le fichier besoins.csv
-    
+        chunksize: Si défini, retourne un itérateur de DataFrames de cette
+                   taille au lieu de tout charger en mémoire
+
     Returns:
-        pandas.DataFrame: DataFrame contenant les besoins
+        pandas.DataFrame (ou itérateur de DataFrames si chunksize est défini)
     """
     csv_path = Path(csv_path)
-    
+
     if not csv_path.exists():
         raise FileNotFoundError(f"Le fichier {csv_path} n'existe pas")
-    
-    df = pd.read_csv(csv_path, sep=';', encoding='utf-8')
+
+    if chunksize:
+        print(f">> Lecture en chunks de {chunksize} lignes depuis {csv_path.name}")
+        return _chunked_read(csv_path, chunksize, dtypes=_NEEDS_DTYPES)
+
+    df = _memoized_needs(str(csv_path.resolve()), csv_path.stat().st_mtime_ns)
     print(f">> {len(df)} besoins chargés depuis {csv_path.name}")
-    
+
     return df
 
 
@@ -57,7 +182,34 @@ def save_matches(matches_df, output_path):
         output_path: Chemin de sortie pour le fichier CSV
     """
     output_path = Path(output_path)
-    matches_df.to_csv(output_path, index=False, sep=';', encoding='utf-8')
+
+    if PYARROW_AVAILABLE:
+        try:
+            # Écriture batchée via Arrow (stringification C, gros blocs write())
+            import pyarrow as pa
+            import pyarrow.csv as pacsv
+
+            table = pa.Table.from_pandas(matches_df, preserve_index=False)
+            pacsv.write_csv(
+                table, output_path,
+                # quoting_style='needed': même quoting minimal que to_csv
+                # (par défaut Arrow quote TOUTES les cellules non numériques)
+                write_options=pacsv.WriteOptions(
+                    delimiter=';', batch_size=65536, quoting_style='needed'
+                )
+            )
+            print(f">> Résultats sauvegardés dans {output_path}")
+            return
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            pass  # Colonnes non convertibles en Arrow → fallback pandas
+
+    # Fallback: to_csv sur un handle avec buffer user-space de 4 MiB
+    # (gros write() au lieu des blocs ~8 Ko par défaut), sans flush manuel
+    with open(output_path, 'w', buffering=4 * 1024 * 1024, encoding='utf-8', newline='') as f:
+        if hasattr(os, 'posix_fadvise'):
+            # Indiquer au kernel une écriture séquentielle (readahead/writeback)
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        matches_df.to_csv(f, index=False, sep=';', chunksize=65536)
     print(f">> Résultats sauvegardés dans {output_path}")
 
 
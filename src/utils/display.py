@@ -2,9 +2,49 @@
 Fonctions d'affichage des résultats de matching
 """
 
+import sys
+
 import pandas as pd
 
 
+def _flush(parts):
+    """
+    Écrit toutes les lignes accumulées en un seul write()
+
+    Un print() par ligne = une syscall (et un flush en TTY) par ligne;
+    assembler la sortie puis écrire une fois réduit tout ça à un seul write.
+    """
+    sys.stdout.write('\n'.join(parts) + '\n')
+
+
+# Templates de ligne de résultat, compilés une fois par combinaison de
+# champs présents (16 max) puis réutilisés via format_map: le format spec
+# n'est re-parsé qu'à la première rencontre, pas à chaque ligne
+_ROW_TMPL_CACHE = {}
+
+
+def _row_template(ville_ok, expertise_ok, dispo_ok, desc_ok):
+    """Retourne (en le compilant au besoin) le template des champs demandés"""
+    flags = (ville_ok, expertise_ok, dispo_ok, desc_ok)
+    tmpl = _ROW_TMPL_CACHE.get(flags)
+    if tmpl is None:
+        lines = [
+            "\n#{idx} - Score de similarité: {score:.1f}%",
+            "   Entreprise: {nom}",
+        ]
+        if ville_ok:
+            lines.append("   Ville: {ville}")
+        if expertise_ok:
+            lines.append("   Expertise: {expertise}")
+        if dispo_ok:
+            lines.append("   Disponibilité: {dispo}")
+        if desc_ok:
+            lines.append("   Services: {desc}")
+        lines.append("-" * 80)
+        tmpl = _ROW_TMPL_CACHE[flags] = '\n'.join(lines)
+    return tmpl
+
+
 def display_matches(results, max_display=5):
     """
     Affiche les résultats de matching de manière lisible
@@ -13,42 +53,54 @@ def display_matches(results, max_display=5):
         results: DataFrame contenant les résultats avec colonne 'similarity_score'
         max_display: Nombre maximum de résultats à afficher
     """
-    print("\n" + "="*80)
-    print("MEILLEURS PRESTATAIRES TROUVES")
-    print("="*80)
-    
+    parts = ["\n" + "="*80, "MEILLEURS PRESTATAIRES TROUVES", "="*80]
+
     if len(results) == 0:
-        print(">> Aucun prestataire ne correspond aux critères")
+        parts.append(">> Aucun prestataire ne correspond aux critères")
+        _flush(parts)
         return
     
     # Limiter l'affichage
     display_results = results.head(max_display)
-    
-    for idx, (_, row) in enumerate(display_results.iterrows(), 1):
-        score_pct = row['similarity_score'] * 100
-        
-        print(f"\n#{idx} - Score de similarité: {score_pct:.1f}%")
-        print(f"   Entreprise: {row['Nom_Entreprise']}")
-        
-        if pd.notna(row.get('Ville')):
-            print(f"   Ville: {row['Ville']}")
-        
-        if pd.notna(row.get('Domaines_Expertise')):
-            print(f"   Expertise: {row['Domaines_Expertise']}")
-        
-        if pd.notna(row.get('Disponibilite')):
-            print(f"   Disponibilité: {row['Disponibilite']}")
-        
-        if pd.notna(row.get('Description_Service')):
-            desc = str(row['Description_Service'])
-            if len(desc) > 150:
-                desc = desc[:150] + "..."
-            print(f"   Services: {desc}")
-        
-        print("-" * 80)
-    
+    n = len(display_results)
+
+    # Pré-extraire les colonnes en tableaux NumPy (pas de boxing pd.Series
+    # par ligne comme avec iterrows)
+    scores = display_results['similarity_score'].to_numpy() * 100
+    noms = display_results['Nom_Entreprise'].to_numpy()
+
+    def _column_or_none(col):
+        if col in display_results.columns:
+            serie = display_results[col]
+            return serie.to_numpy(), serie.notna().to_numpy()
+        return [None] * n, [False] * n
+
+    villes, villes_ok = _column_or_none('Ville')
+    expertises, expertises_ok = _column_or_none('Domaines_Expertise')
+    dispos, dispos_ok = _column_or_none('Disponibilite')
+
+    # Troncature des descriptions en une passe vectorisée
+    if 'Description_Service' in display_results.columns:
+        descs_serie = display_results['Description_Service']
+        descs_ok = descs_serie.notna().to_numpy()
+        descs_str = descs_serie.astype(str)
+        too_long = descs_str.str.len() > 150
+        descs = descs_str.str.slice(0, 150).where(~too_long, descs_str.str.slice(0, 150) + "...").to_numpy()
+    else:
+        descs, descs_ok = [None] * n, [False] * n
+
+    for i in range(n):
+        tmpl = _row_template(villes_ok[i], expertises_ok[i], dispos_ok[i], descs_ok[i])
+        parts.append(tmpl.format_map({
+            'idx': i + 1, 'score': scores[i], 'nom': noms[i],
+            'ville': villes[i], 'expertise': expertises[i],
+            'dispo': dispos[i], 'desc': descs[i],
+        }))
+
     if len(results) > max_display:
-        print(f"\n... et {len(results) - max_display} autres résultats")
+        parts.append(f"\n... et {len(results) - max_display} autres résultats")
+
+    _flush(parts)
 
 
 def display_match_summary(results):
@@ -61,22 +113,25 @@ def display_match_summary(results):
     if len(results) == 0:
         print("\n>> Aucun match trouvé")
         return
-    
-    print("\n" + "="*80)
-    print("RESUME DES RESULTATS")
-    print("="*80)
-    
-    print(f"\nNombre de matches trouvés: {len(results)}")
-    print(f"Score moyen: {results['similarity_score'].mean()*100:.1f}%")
-    print(f"Meilleur score: {results['similarity_score'].max()*100:.1f}%")
-    print(f"Score le plus bas: {results['similarity_score'].min()*100:.1f}%")
-    
+
+    parts = ["\n" + "="*80, "RESUME DES RESULTATS", "="*80]
+
+    parts.append(f"\nNombre de matches trouvés: {len(results)}")
+    parts.append(f"Score moyen: {results['similarity_score'].mean()*100:.1f}%")
+    parts.append(f"Meilleur score: {results['similarity_score'].max()*100:.1f}%")
+    parts.append(f"Score le plus bas: {results['similarity_score'].min()*100:.1f}%")
+
     # Répartition par disponibilité
     if 'Disponibilite' in results.columns:
-        print("\nRépartition par disponibilité:")
+        parts.append("\nRépartition par disponibilité:")
+        # Sur dtype categorical, value_counts inclut les catégories à zéro
+        # occurrence: on les filtre pour ne pas afficher de lignes '...: 0'
         avail_counts = results['Disponibilite'].value_counts()
+        avail_counts = avail_counts[avail_counts > 0]
         for avail, count in avail_counts.items():
-            print(f"  - {avail}: {count}")
+            parts.append(f"  - {avail}: {count}")
+
+    _flush(parts)
 
 
 def display_request_info(request_text):
@@ -86,10 +141,7 @@ def display_request_info(request_text):
     Args:
         request_text: Texte de la requête formaté
     """
-    print("\n" + "="*80)
-    print("REQUETE CLIENT")
-    print("="*80)
-    print(f"\n{request_text}")
+    _flush(["\n" + "="*80, "REQUETE CLIENT", "="*80, f"\n{request_text}"])
 
 
 def display_detailed_match(provider_row):
@@ -99,29 +151,29 @@ def display_detailed_match(provider_row):
     Args:
         provider_row: pandas.Series contenant les données du prestataire
     """
-    print("\n" + "="*80)
-    print("DETAILS DU PRESTATAIRE")
-    print("="*80)
-    
+    parts = ["\n" + "="*80, "DETAILS DU PRESTATAIRE", "="*80]
+
     if 'Nom_Entreprise' in provider_row:
-        print(f"\nEntreprise: {provider_row['Nom_Entreprise']}")
-    
+        parts.append(f"\nEntreprise: {provider_row['Nom_Entreprise']}")
+
     if 'similarity_score' in provider_row:
         score_pct = provider_row['similarity_score'] * 100
-        print(f"Score de similarité: {score_pct:.1f}%")
-    
+        parts.append(f"Score de similarité: {score_pct:.1f}%")
+
     if 'Domaines_Expertise' in provider_row:
-        print(f"\nDomaines d'expertise:")
+        parts.append(f"\nDomaines d'expertise:")
         domains = str(provider_row['Domaines_Expertise']).split(',')
         for domain in domains:
-            print(f"  - {domain.strip()}")
-    
+            parts.append(f"  - {domain.strip()}")
+
     if 'Disponibilite' in provider_row:
-        print(f"\nDisponibilité: {provider_row['Disponibilite']}")
-    
+        parts.append(f"\nDisponibilité: {provider_row['Disponibilite']}")
+
     if 'Description_Service' in provider_row:
-        print(f"\nDescription des services:")
-        print(f"  {provider_row['Description_Service']}")
+        parts.append(f"\nDescription des services:")
+        parts.append(f"  {provider_row['Description_Service']}")
+
+    _flush(parts)
 
 
 def create_results_table(results):
@@ -144,10 +196,13 @@ def create_results_table(results):
         display_df['Score (%)'] = (display_df['similarity_score'] * 100).round(1)
         display_df = display_df.drop('similarity_score', axis=1)
     
-    # Tronquer les descriptions longues
+    # Tronquer les descriptions longues (une passe vectorisée, pas de
+    # str()/len() Python par ligne)
     if 'Description_Service' in display_df.columns:
-        display_df['Description_Service'] = display_df['Description_Service'].apply(
-            lambda x: str(x)[:100] + "..." if len(str(x)) > 100 else str(x)
+        descs = display_df['Description_Service'].astype('string')
+        too_long = descs.str.len() > 100
+        display_df['Description_Service'] = descs.str.slice(0, 100).where(
+            ~too_long, descs.str.slice(0, 100) + "..."
         )
-    
+
     return display_df
@@ -5,6 +5,24 @@ Métriques d'évaluation pour le matching
 import numpy as np
 import pandas as pd
 
+# Essayer d'importer joblib (parallélisation de l'évaluation par requête)
+try:
+    from joblib import Parallel, delayed
+    JOBLIB_AVAILABLE = True
+except ImportError:
+    JOBLIB_AVAILABLE = False
+
+# En dessous de ce nombre de requêtes, le coût de démarrage du pool
+# dépasse le gain: on reste séquentiel
+_PARALLEL_MIN_QUERIES = 1000
+
+# Tables DCG précalculées à l'import: 1/log2(rang+1) pour les rangs
+# 1.._MAX_K et les IDCG cumulés (_IDCG_CUMSUM[m] = IDCG pour m pertinents).
+# Évite le dispatch np.log2 scalaire à chaque appel de NDCG.
+_MAX_K = 10_000
+_LOG2_INV = 1.0 / np.log2(np.arange(2, _MAX_K + 2))
+_IDCG_CUMSUM = np.concatenate([[0.0], _LOG2_INV.cumsum()])
+
 
 def calculate_precision_at_k(predicted_ids, relevant_ids, k):
     """
@@ -68,23 +86,23 @@ def calculate_average_precision(predicted_ids, relevant_ids, k=None):
     """
     if len(relevant_ids) == 0:
         return 0.0
-    
+
     if k is not None:
         predicted_ids = predicted_ids[:k]
-    
-    score = 0.0
-    num_relevant = 0
-    
-    for i, pred_id in enumerate(predicted_ids, 1):
-        if pred_id in relevant_ids:
-            num_relevant += 1
-            precision_at_i = num_relevant / i
-            score += precision_at_i
-    
-    if num_relevant == 0:
+
+    # Containment haché (O(1) par lookup) puis précisions cumulées vectorisées
+    rel_set = frozenset(relevant_ids)
+    hits = np.fromiter(
+        (pred_id in rel_set for pred_id in predicted_ids),
+        dtype=np.int8, count=len(predicted_ids)
+    )
+
+    if not hits.any():
         return 0.0
-    
-    return score / len(relevant_ids)
+
+    precisions = np.cumsum(hits) / np.arange(1, len(hits) + 1)
+
+    return float((precisions * hits).sum() / len(relevant_ids))
 
 
 def calculate_mean_average_precision(all_predictions, all_relevant, k=None):
@@ -121,8 +139,9 @@ def calculate_mrr(predicted_ids, relevant_ids):
     Returns:
         float: Reciprocal rank (1/rang du premier pertinent)
     """
+    rel_set = frozenset(relevant_ids)
     for i, pred_id in enumerate(predicted_ids, 1):
-        if pred_id in relevant_ids:
+        if pred_id in rel_set:
             return 1.0 / i
     return 0.0
 
@@ -141,22 +160,52 @@ def calculate_ndcg_at_k(predicted_ids, relevant_ids, k):
     """
     if len(relevant_ids) == 0:
         return 0.0
-    
-    # DCG
-    dcg = 0.0
-    for i, pred_id in enumerate(predicted_ids[:k], 1):
-        if pred_id in relevant_ids:
-            dcg += 1.0 / np.log2(i + 1)
-    
-    # IDCG (ideal DCG)
-    idcg = 0.0
-    for i in range(min(len(relevant_ids), k)):
-        idcg += 1.0 / np.log2(i + 2)
-    
-    if idcg == 0:
-        return 0.0
-    
-    return dcg / idcg
+
+    # DCG = hits @ table précalculée; IDCG lu directement dans le cumsum
+    hits = np.isin(np.asarray(predicted_ids[:k]), np.asarray(relevant_ids))
+    dcg = float(hits @ _LOG2_INV[:len(hits)])
+    idcg = _IDCG_CUMSUM[min(len(relevant_ids), k)]
+
+    return dcg / idcg if idcg else 0.0
+
+
+def _per_query_metrics(preds, relevant, k_values, k_max):
+    """
+    Calcule toutes les métriques d'UNE requête en une seule passe
+
+    Le masque de hits et son cumsum servent pour tous les k (au lieu de
+    reconstruire 3 sets par couple (requête, k)).
+
+    Args:
+        preds: Prédictions ordonnées de la requête
+        relevant: IDs pertinents de la requête
+        k_values: Liste des k pour les métriques @k
+        k_max: max(k_values), pré-calculé par l'appelant
+
+    Returns:
+        dict: métrique -> valeur pour cette requête
+    """
+    row = {}
+    hits = np.isin(preds[:k_max], relevant)
+    cum = np.cumsum(hits)
+    n_rel = len(relevant)
+
+    for k in k_values:
+        found = int(cum[min(k, len(cum)) - 1]) if len(cum) else 0
+        row[f'precision@{k}'] = found / k
+        row[f'recall@{k}'] = found / n_rel if n_rel else 0.0
+        if n_rel:
+            hits_k = hits[:k]
+            dcg = float(hits_k @ _LOG2_INV[:len(hits_k)])
+            row[f'ndcg@{k}'] = dcg / _IDCG_CUMSUM[min(n_rel, k)]
+        else:
+            row[f'ndcg@{k}'] = 0.0
+
+    row['MAP'] = calculate_average_precision(preds, relevant)
+    row['MAP@5'] = calculate_average_precision(preds, relevant, k=5)
+    row['MRR'] = calculate_mrr(preds, relevant)
+
+    return row
 
 
 def evaluate_model_results(predictions_df, ground_truth_df, k_values=[1, 3, 5]):
@@ -171,49 +220,43 @@ def evaluate_model_results(predictions_df, ground_truth_df, k_values=[1, 3, 5]):
     Returns:
         dict: Dictionnaire contenant toutes les métriques
     """
-    metrics = {}
-    
-    # Grouper par besoin
+    # Grouper par besoin en UNE passe (au lieu d'un scan booléen du DataFrame
+    # complet par besoin_id, soit O(Q·N))
+    preds_by_id = {
+        besoin_id: group.to_numpy()
+        for besoin_id, group in predictions_df.groupby('besoin_id')['prestataire_id']
+    }
+    relevant_by_id = {
+        besoin_id: group.to_numpy()
+        for besoin_id, group in ground_truth_df.loc[
+            ground_truth_df['pertinence'] == 1
+        ].groupby('besoin_id')['prestataire_id']
+    }
+
+    _empty = np.array([], dtype=object)
     all_predictions = []
     all_relevant = []
-    
+
     for besoin_id in ground_truth_df['besoin_id'].unique():
-        # Prédictions pour ce besoin (triées par score/rank)
-        preds = predictions_df[predictions_df['besoin_id'] == besoin_id]
-        pred_ids = preds['prestataire_id'].tolist()
-        
+        # Prédictions pour ce besoin (ordre score/rank préservé par groupby)
+        all_predictions.append(preds_by_id.get(besoin_id, _empty))
         # Vérité terrain pour ce besoin
-        gt = ground_truth_df[
-            (ground_truth_df['besoin_id'] == besoin_id) & 
-            (ground_truth_df['pertinence'] == 1)
-        ]
-        relevant_ids = gt['prestataire_id'].tolist()
-        
-        all_predictions.append(pred_ids)
-        all_relevant.append(relevant_ids)
-    
-    # Calculer les métriques pour chaque k
-    for k in k_values:
-        precisions = [calculate_precision_at_k(p, r, k) 
-                     for p, r in zip(all_predictions, all_relevant)]
-        recalls = [calculate_recall_at_k(p, r, k) 
-                  for p, r in zip(all_predictions, all_relevant)]
-        ndcgs = [calculate_ndcg_at_k(p, r, k) 
-                for p, r in zip(all_predictions, all_relevant)]
-        
-        metrics[f'precision@{k}'] = np.mean(precisions)
-        metrics[f'recall@{k}'] = np.mean(recalls)
-        metrics[f'ndcg@{k}'] = np.mean(ndcgs)
-    
-    # MAP
-    metrics['MAP'] = calculate_mean_average_precision(all_predictions, all_relevant)
-    metrics['MAP@5'] = calculate_mean_average_precision(all_predictions, all_relevant, k=5)
-    
-    # MRR
-    mrrs = [calculate_mrr(p, r) for p, r in zip(all_predictions, all_relevant)]
-    metrics['MRR'] = np.mean(mrrs)
-    
-    return metrics
+        all_relevant.append(relevant_by_id.get(besoin_id, _empty))
+    
+    # Les requêtes sont indépendantes: au-delà de _PARALLEL_MIN_QUERIES,
+    # fan-out joblib sur tous les coeurs; sinon boucle séquentielle (le
+    # démarrage du pool coûterait plus cher que le calcul)
+    k_max = max(k_values)
+    pairs = zip(all_predictions, all_relevant)
+
+    if JOBLIB_AVAILABLE and len(all_predictions) >= _PARALLEL_MIN_QUERIES:
+        rows = Parallel(n_jobs=-1, batch_size=256)(
+            delayed(_per_query_metrics)(p, r, k_values, k_max) for p, r in pairs
+        )
+    else:
+        rows = [_per_query_metrics(p, r, k_values, k_max) for p, r in pairs]
+
+    return pd.DataFrame(rows).mean().to_dict()
 
 
 def compute_matching_score(metrics, weights=None):
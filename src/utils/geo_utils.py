@@ -3,9 +3,16 @@ Utilitaire pour calculer les distances géographiques entre villes françaises
 Utilise geopy pour un géocodage automatique et des distances précises
 """
 
+import atexit
+import json
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
 from typing import Dict, Optional, Tuple
 from math import radians, cos, sin, asin, sqrt
 
+import numpy as np
+
 # Essayer d'importer geopy (plus précis et automatique)
 try:
     from geopy.geocoders import Nominatim
@@ -16,8 +23,44 @@ except ImportError:
     print("⚠️  geopy non installé. Installation recommandée : pip install geopy")
 
 
-# Cache pour éviter de géocoder plusieurs fois la même ville
-_geocode_cache: Dict[str, Optional[Tuple[float, float]]] = {}
+# Cache persistant pour éviter de re-géocoder les mêmes villes d'un run à
+# l'autre (Nominatim = ~1s de réseau par requête + rate limit)
+_GEOCODE_CACHE_PATH = Path.home() / '.cache' / 'zeus_geocode.json'
+
+
+def _load_geocode_cache() -> Dict[str, Optional[Tuple[float, float]]]:
+    """Charge le cache de géocodage depuis le disque (vide si absent/corrompu)"""
+    try:
+        raw = json.loads(_GEOCODE_CACHE_PATH.read_text(encoding='utf-8'))
+        return {
+            ville: tuple(coords) if coords is not None else None
+            for ville, coords in raw.items()
+        }
+    except (OSError, ValueError):
+        return {}
+
+
+_geocode_cache: Dict[str, Optional[Tuple[float, float]]] = _load_geocode_cache()
+_geocode_cache_dirty = False
+
+# Échecs transitoires (timeout, rate-limit Nominatim...): mémorisés pour le
+# process courant seulement, JAMAIS persistés — sinon une coupure réseau
+# marquerait la ville comme introuvable pour tous les runs futurs
+_geocode_transient_failures: set = set()
+
+
+def _save_geocode_cache():
+    """Écrit le cache sur disque en une fois à la fin du process (si modifié)"""
+    if not _geocode_cache_dirty:
+        return
+    try:
+        _GEOCODE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        _GEOCODE_CACHE_PATH.write_text(json.dumps(_geocode_cache), encoding='utf-8')
+    except OSError:
+        pass  # Best-effort: home en lecture seule, disque plein...
+
+
+atexit.register(_save_geocode_cache)
 
 # Géocodeur Nominatim (OpenStreetMap)
 if GEOPY_AVAILABLE:
@@ -58,49 +101,213 @@ COORDONNEES_VILLES = {
 }
 
 
-def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+# Représentation SoA (structure of arrays) des coordonnées: tableaux NumPy
+# alignés + index ville -> position, pour vectoriser les calculs de distance
+_CITY_KEYS = list(COORDONNEES_VILLES)
+_CITY_IDX = {ville: i for i, ville in enumerate(_CITY_KEYS)}
+_LATLON_RAD = np.radians(np.array(list(COORDONNEES_VILLES.values()), dtype=np.float64))
+
+
+@lru_cache(maxsize=4096)
+def _normalize(ville: str) -> str:
     """
-    Calcule la distance en km entre deux points GPS avec la formule de Haversine
-    
+    Forme canonique d'un nom de ville: sans accents, sans espaces, minuscules
+
+    Mémoïsé: les mêmes noms reviennent sans arrêt dans les données, la
+    normalisation Unicode n'est payée qu'une fois par chaîne distincte.
+    """
+    decomposed = unicodedata.normalize('NFKD', ville)
+    sans_accents = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return sans_accents.strip().lower()
+
+
+# Lookup tolérant à la casse et aux accents ('ORLEANS ' → 'Orléans')
+_NORM_CITY_IDX = {_normalize(ville): i for i, ville in enumerate(_CITY_KEYS)}
+
+# Rayon de la Terre en km
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_pairwise(lat1_rad, lon1_rad, lat2_rad, lon2_rad):
+    """
+    Calcule les distances Haversine élément par élément sur des tableaux NumPy
+
+    Toutes les entrées sont en RADIANS (scalaires ou tableaux broadcastables).
+
     Args:
-        lat1, lon1: Latitude et longitude du point 1
-        lat2, lon2: Latitude et longitude du point 2
-        
+        lat1_rad, lon1_rad: Latitude(s) et longitude(s) des points 1
+        lat2_rad, lon2_rad: Latitude(s) et longitude(s) des points 2
+
     Returns:
-        Distance en kilomètres
+        numpy.ndarray: Distances en kilomètres
+    """
+    dlat = lat2_rad - lat1_rad
+    dlon = lon2_rad - lon1_rad
+
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(dlon / 2) ** 2
+
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def haversine_matrix(idx1, idx2):
+    """
+    Calcule les distances entre villes repérées par leurs indices SoA
+
+    Les indices proviennent de _CITY_IDX (ordre de COORDONNEES_VILLES).
+
+    Args:
+        idx1: Indice(s) des premières villes (int ou array)
+        idx2: Indice(s) des secondes villes (int ou array)
+
+    Returns:
+        numpy.ndarray: Distances en kilomètres (broadcastées)
+    """
+    idx1 = np.asarray(idx1)
+    idx2 = np.asarray(idx2)
+
+    return haversine_pairwise(
+        _LATLON_RAD[idx1, 0], _LATLON_RAD[idx1, 1],
+        _LATLON_RAD[idx2, 0], _LATLON_RAD[idx2, 1]
+    )
+
+
+def _haversine_impl(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Implémentation scalaire de Haversine (ops numériques pures, JIT-compilable)
     """
-    # Rayon de la Terre en km
-    R = 6371.0
-    
     # Conversion en radians
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-    
+    lat1 = radians(lat1)
+    lon1 = radians(lon1)
+    lat2 = radians(lat2)
+    lon2 = radians(lon2)
+
     # Différences
     dlat = lat2 - lat1
     dlon = lon2 - lon1
-    
+
     # Formule de Haversine
     a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
     c = 2 * asin(sqrt(a))
-    
-    return R * c
+
+    return EARTH_RADIUS_KM * c
+
+
+# Essayer de compiler le chemin scalaire en natif avec Numba
+# (cache=True: la compilation n'est payée qu'une fois, puis relue sur disque)
+try:
+    from numba import njit
+    _haversine_compiled = njit(fastmath=True, cache=True)(_haversine_impl)
+    NUMBA_AVAILABLE = True
+except ImportError:
+    _haversine_compiled = _haversine_impl
+    NUMBA_AVAILABLE = False
+
+
+def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Calcule la distance en km entre deux points GPS avec la formule de Haversine
+
+    Args:
+        lat1, lon1: Latitude et longitude du point 1
+        lat2, lon2: Latitude et longitude du point 2
+
+    Returns:
+        Distance en kilomètres
+    """
+    return _haversine_compiled(lat1, lon1, lat2, lon2)
+
+
+# Index spatial sur les villes de la base (construit paresseusement:
+# l'import sklearn et la construction ne sont payés qu'au premier usage)
+_balltree = None
+
+
+def _get_balltree():
+    """Construit (une fois) un BallTree haversine sur les coordonnées des villes"""
+    global _balltree
+    if _balltree is None:
+        from sklearn.neighbors import BallTree
+        _balltree = BallTree(_LATLON_RAD, metric='haversine')
+    return _balltree
+
+
+def find_villes_within(ville: str, radius_km: float) -> list:
+    """
+    Retourne les villes de la base à moins de radius_km de la ville donnée
+
+    Requête O(log N) sur l'index spatial, au lieu de N calculs de distance.
+
+    Args:
+        ville: Ville de référence (doit être dans la base hardcodée)
+        radius_km: Rayon de recherche en kilomètres
+
+    Returns:
+        Liste des noms de villes dans le rayon (ville de référence exclue)
+    """
+    idx = _NORM_CITY_IDX.get(_normalize(ville))
+    if idx is None:
+        return []
+
+    neighbors = _get_balltree().query_radius(
+        _LATLON_RAD[idx:idx + 1], r=radius_km / EARTH_RADIUS_KM
+    )[0]
+
+    return [_CITY_KEYS[i] for i in neighbors if i != idx]
+
+
+def nearest_villes(ville: str, k: int = 5) -> list:
+    """
+    Retourne les k villes de la base les plus proches de la ville donnée
+
+    Args:
+        ville: Ville de référence (doit être dans la base hardcodée)
+        k: Nombre de voisins à retourner
+
+    Returns:
+        Liste de tuples (nom_ville, distance_km), triée par distance
+    """
+    idx = _NORM_CITY_IDX.get(_normalize(ville))
+    if idx is None:
+        return []
+
+    k = min(k + 1, len(_CITY_KEYS))  # +1 pour exclure la ville elle-même
+    distances, indices = _get_balltree().query(_LATLON_RAD[idx:idx + 1], k=k)
+
+    return [
+        (_CITY_KEYS[i], float(d) * EARTH_RADIUS_KM)
+        for d, i in zip(distances[0], indices[0])
+        if i != idx
+    ]
 
 
 def get_distance_entre_villes(ville1: str, ville2: str) -> Optional[float]:
     """
     Retourne la distance en km entre deux villes françaises
-    
+
     Stratégie :
     1. Essayer avec geopy (géocodage automatique, toutes villes)
     2. Fallback sur base hardcodée si geopy échoue
-    
+
     Args:
         ville1: Nom de la première ville
         ville2: Nom de la deuxième ville
-        
+
     Returns:
         Distance en km, ou None si impossible de calculer
     """
+    # La distance est symétrique: ordonner la paire pour qu'une seule
+    # entrée de cache couvre (A, B) et (B, A)
+    a, b = sorted((ville1.strip(), ville2.strip()))
+
+    if a == b:
+        return 0.0
+
+    return _distance_cached(a, b)
+
+
+@lru_cache(maxsize=65536)
+def _distance_cached(ville1: str, ville2: str) -> Optional[float]:
+    """Travail réel de get_distance_entre_villes (villes strip(), ordonnées)"""
     # Méthode 1 : Utiliser geopy (préféré)
     if GEOPY_AVAILABLE:
         try:
@@ -115,54 +322,65 @@ def get_distance_entre_villes(ville1: str, ville2: str) -> Optional[float]:
             # Si geopy échoue, fallback sur méthode classique
             pass
     
-    # Méthode 2 : Fallback sur base hardcodée
-    ville1_clean = ville1.strip()
-    ville2_clean = ville2.strip()
-    
-    if ville1_clean not in COORDONNEES_VILLES or ville2_clean not in COORDONNEES_VILLES:
+    # Méthode 2 : Fallback sur base hardcodée (lookup par indice SoA,
+    # tolérant à la casse/aux accents, coordonnées déjà en radians)
+    idx1 = _NORM_CITY_IDX.get(_normalize(ville1))
+    idx2 = _NORM_CITY_IDX.get(_normalize(ville2))
+
+    if idx1 is None or idx2 is None:
         return None
-    
-    lat1, lon1 = COORDONNEES_VILLES[ville1_clean]
-    lat2, lon2 = COORDONNEES_VILLES[ville2_clean]
-    
-    return haversine_distance(lat1, lon1, lat2, lon2)
+
+    return float(haversine_pairwise(
+        _LATLON_RAD[idx1, 0], _LATLON_RAD[idx1, 1],
+        _LATLON_RAD[idx2, 0], _LATLON_RAD[idx2, 1]
+    ))
 
 
 def _geocode_ville(ville: str) -> Optional[Tuple[float, float]]:
     """
     Géocode une ville française pour obtenir ses coordonnées GPS
     
-    Utilise un cache pour éviter de géocoder plusieurs fois la même ville
-    
+    Utilise un cache persisté sur disque: les runs suivants ne refont
+    aucune requête réseau pour les villes déjà résolues
+
     Args:
         ville: Nom de la ville
-        
+
     Returns:
         Tuple (latitude, longitude) ou None si introuvable
     """
+    global _geocode_cache_dirty
+
     if not GEOPY_AVAILABLE:
         return None
-    
+
     ville_clean = ville.strip()
-    
-    # Vérifier le cache
+
+    # Vérifier le cache (persisté) puis les échecs du process courant
     if ville_clean in _geocode_cache:
         return _geocode_cache[ville_clean]
-    
+    if ville_clean in _geocode_transient_failures:
+        return None
+
     try:
         # Géocoder avec contexte français
         location = _geolocator.geocode(f"{ville_clean}, France", language='fr')
-        
+
         if location:
             coords = (location.latitude, location.longitude)
             _geocode_cache[ville_clean] = coords
+            _geocode_cache_dirty = True
             return coords
         else:
+            # Réponse définitive du service: la ville n'existe pas → persistable
             _geocode_cache[ville_clean] = None
+            _geocode_cache_dirty = True
             return None
-            
-    except Exception as e:
-        _geocode_cache[ville_clean] = None
+
+    except Exception:
+        # Erreur transitoire (timeout, rate-limit): on évite de re-tenter
+        # dans ce process mais on ne persiste rien sur disque
+        _geocode_transient_failures.add(ville_clean)
         return None
 
 
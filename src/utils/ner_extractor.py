@@ -10,9 +10,167 @@ Version 2.0: Score géographique mathématiquement rigoureux
 
 import re
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Dict, Optional, List
 from math import exp
-from .geo_utils import get_distance_entre_villes
+
+import numpy as np
+
+from .geo_utils import COORDONNEES_VILLES, get_distance_entre_villes, haversine_pairwise
+
+# Essayer d'importer pyahocorasick (automate multi-motifs en C: scan des
+# villes en O(len(message)) quel que soit la taille du vocabulaire)
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Essayer d'importer re2 (moteur DFA de Google: temps linéaire garanti sur
+# les grandes alternations, sans backtracking); repli transparent sur re.
+# Réservé aux alternations SANS \b ni \w: sous re2 ces classes sont
+# ASCII-only et cassent les patterns qui doivent couvrir des lettres
+# accentuées ('cassé\b', 'vendée\b', 'en \w+' sur 'en août')
+try:
+    import re2 as _regex
+    RE2_AVAILABLE = True
+except ImportError:
+    _regex = re
+    RE2_AVAILABLE = False
+
+
+# Coefficients de décroissance exponentielle indexés par impact_geo:
+#   0 → score constant = 1.0 (services en ligne)
+#   1 → décroissance modérée (50% à 46km, 10% à 154km)
+#   2 → décroissance forte (50% à 14km, 10% à 46km)
+_ALPHA = (0.0, 0.015, 0.05)
+
+
+def _geo_scores_from_distances(distances, alpha, out):
+    """
+    Noyau scalaire du score batch: out[i] = exp(-alpha * d)
+
+    Ops numériques pures → JIT-compilable par Numba (même approche que le
+    noyau Haversine de geo_utils). Le noyau suppose des distances FINIES:
+    sous fastmath, LLVM compile en supposant l'absence de NaN (un test
+    `d != d` serait éliminé), donc le repli 0.7 des villes inconnues est
+    appliqué par l'appelant AVANT l'appel.
+    """
+    for i in range(distances.shape[0]):
+        out[i] = exp(-alpha * distances[i])
+
+
+# Essayer de compiler le noyau en natif avec Numba (repli Python sinon)
+try:
+    from numba import njit
+    _geo_scores_kernel = njit(fastmath=True, cache=True)(_geo_scores_from_distances)
+    NUMBA_AVAILABLE = True
+except ImportError:
+    _geo_scores_kernel = _geo_scores_from_distances
+    NUMBA_AVAILABLE = False
+
+
+@lru_cache(maxsize=100_000)
+def _geo_score_cached(ville_besoin: str, ville_prestataire: str, impact_geo: int) -> float:
+    """
+    Calcul memoïsé du score exponentiel exp(-alpha * distance)
+
+    Le même triplet (ville besoin, ville prestataire, impact_geo) revient
+    pour chaque prestataire de la même ville à chaque matching: le cache
+    évite de recalculer distance GPS + exponentielle à chaque appel.
+
+    Les villes arrivent déjà minusculisées et strippées par l'appelant:
+    'Paris', ' PARIS ' et 'paris' partagent ainsi la même entrée de cache.
+    """
+    # Même ville → score maximal
+    if ville_besoin == ville_prestataire:
+        return 1.0
+
+    # Villes de la base → score directement lu dans la matrice précalculée
+    # (aucun exp() au moment du matching)
+    i = _CITY_INDEX.get(ville_besoin)
+    j = _CITY_INDEX.get(ville_prestataire)
+    if i is not None and j is not None:
+        return float(_GEO_SCORES[impact_geo, i, j])
+
+    distance_km = get_distance_entre_villes(ville_besoin, ville_prestataire)
+
+    if distance_km is None:
+        # Ville non reconnue dans la base GPS → pénalité modérée
+        return 0.7
+
+    # Formule exponentielle décroissante (bornée dans [0, 1] par construction)
+    return exp(-_ALPHA[impact_geo] * distance_km)
+
+
+def _build_contraintes_table() -> Dict:
+    """
+    Énumère toutes les combinaisons (ville présente, urgence, horizon)
+
+    Le domaine est fini et minuscule (2 × 4 × 4 entrées): précalculer la
+    table remplace la chaîne de branches de _determiner_contraintes par
+    un seul lookup de dict.
+    """
+    table = {}
+    for has_ville in (True, False):
+        for urgence in ('IMMEDIATE', 'SHORT_TERM', 'PLANNED', 'STANDARD'):
+            for horizon in ('IMMEDIATE', 'SHORT_TERM', 'PLANNED', None):
+                ville_c = 'PREFERRED' if has_ville else 'NATIONAL'
+                if urgence == 'IMMEDIATE' or horizon == 'IMMEDIATE':
+                    dispo = '24/7'
+                elif urgence == 'SHORT_TERM' or horizon == 'SHORT_TERM':
+                    dispo = 'RAPIDE'
+                elif urgence == 'PLANNED' or horizon == 'PLANNED':
+                    dispo = 'ALL'
+                else:
+                    dispo = 'SEMAINE'
+                table[(has_ville, urgence, horizon)] = (ville_c, dispo)
+    return table
+
+
+_CONTRAINTES_TABLE = _build_contraintes_table()
+
+
+# Capacités de disponibilité encodées en bits: la compatibilité devient un
+# AND entier au lieu de cinq scans de sous-chaînes par appel
+BIT_247 = 1 << 0
+BIT_URGENCE = 1 << 1
+BIT_RAPIDE = 1 << 2
+BIT_SAMEDI = 1 << 3
+BIT_ENLIGNE = 1 << 4
+BIT_SEMAINE = 1 << 5  # posé pour tout prestataire (toujours compatible SEMAINE/ALL)
+
+_DISPO_FLAGS = (
+    ('24/7', BIT_247),
+    ('urgence', BIT_URGENCE),
+    ('rapide', BIT_RAPIDE),
+    ('samedi', BIT_SAMEDI),
+    ('en ligne', BIT_ENLIGNE),
+)
+
+# Bits acceptés pour chaque contrainte déduite
+REQUIRED_DISPO_MASKS = {
+    'ALL': ~0,
+    'SEMAINE': ~0,
+    '24/7': BIT_247 | BIT_URGENCE,
+    'RAPIDE': BIT_247 | BIT_URGENCE | BIT_RAPIDE | BIT_SAMEDI | BIT_ENLIGNE,
+}
+
+
+@lru_cache(maxsize=1024)
+def build_dispo_mask(prestataire_dispo: str) -> int:
+    """
+    Encode la chaîne de disponibilité d'un prestataire en bitmask
+
+    Mémoïsé: les mêmes libellés de disponibilité reviennent pour tous les
+    matchings, le parsing de chaîne n'est payé qu'une fois par libellé.
+    """
+    dispo_lower = prestataire_dispo.lower()
+    mask = BIT_SEMAINE
+    for token, bit in _DISPO_FLAGS:
+        if token in dispo_lower:
+            mask |= bit
+    return mask
 
 
 class NERExtractor:
@@ -20,7 +178,12 @@ class NERExtractor:
     Extracteur d'entités nommées pour le matching de services
     Extrait: Ville, Temporalité, Urgence
     """
-    
+
+    # Aucun état par instance (tout est constant de classe): pas de
+    # __dict__ à allouer à chaque NERExtractor()
+    __slots__ = ()
+
+
     # Villes françaises courantes dans le contexte militaire
     VILLES_FRANCE = [
         'Paris', 'Lyon', 'Marseille', 'Toulouse', 'Lille', 'Bordeaux',
@@ -59,62 +222,169 @@ class NERExtractor:
         'rapidement', 'vite', 'bientôt', 'court terme',
         'sous peu', 'dès que possible'
     ]
-    
-    def extract_ville(self, message: str) -> Optional[str]:
+
+    # Patterns compilés UNE fois au chargement de la classe: les recompiler
+    # à chaque message (174 f-strings + re.search pour les seules villes)
+    # repose sur le cache LRU de 512 entrées du module re, vite saturé.
+    # Toutes les villes dans UNE alternation: un seul scan C du message au
+    # lieu d'un re.search par ville (tri par longueur décroissante pour que
+    # le nom le plus long gagne, ex. 'Saint-Étienne' avant un préfixe)
+    # Formes minuscules précalculées une seule fois: toutes les structures
+    # dérivées (alternation, set, automate) se construisent dessus sans
+    # rappeler .lower() sur les constantes
+    _VILLES_FRANCE_LOWER = tuple(ville.lower() for ville in VILLES_FRANCE)
+
+    # Reste sur le `re` stdlib: le \b de re2 est ASCII-only et ne voit pas
+    # de frontière après une lettre accentuée ('vendée', 'saint-étienne')
+    _CITY_ALTERNATION = re.compile(
+        r'\b(' + '|'.join(
+            re.escape(ville)
+            for ville in sorted(_VILLES_FRANCE_LOWER, key=len, reverse=True)
+        ) + r')\b'
+    )
+    _CITY_LOWER_TO_CANONICAL = {
+        lower: ville for ville, lower in zip(VILLES_FRANCE, _VILLES_FRANCE_LOWER)
+    }
+
+    # Appartenance O(1) pour les candidats extraits par les patterns
+    # indirects (remplace le scan linéaire de VILLES_FRANCE)
+    _VILLES_SET = frozenset(_VILLES_FRANCE_LOWER)
+
+    _MUTATION_RE = re.compile(r'mutation (?:sur|à|vers) (\w+)')
+    _UNITE_RE = re.compile(r'unité (?:de|à) (\w+)')
+
+    # Chaque famille temporelle fusionnée en UNE alternation: un seul scan
+    # du message au lieu d'un re.search par pattern (jusqu'à 26 au total)
+    _IMMEDIATE_RE = _regex.compile('|'.join(f'(?:{p})' for p in PATTERNS_IMMEDIATE))
+    _SHORT_TERM_RE = _regex.compile('|'.join(f'(?:{p})' for p in PATTERNS_SHORT_TERM))
+    # Stdlib `re` obligatoire: PATTERNS_PLANNED contient \w ('en \w+'),
+    # ASCII-only sous re2 comme \b — 'en août' ne matcherait plus
+    _PLANNED_RE = re.compile('|'.join(f'(?:{p})' for p in PATTERNS_PLANNED))
+
+    _NB_JOURS_RE = re.compile(r'(\d+)\s+(jour|semaine)')
+    _NB_MOIS_RE = re.compile(r'(\d+)\s+mois')
+
+    # Mois français: un scan d'alternation remplace douze `in`
+    _MOIS_MAP = {
+        'janvier': 1, 'février': 2, 'mars': 3, 'avril': 4,
+        'mai': 5, 'juin': 6, 'juillet': 7, 'août': 8,
+        'septembre': 9, 'octobre': 10, 'novembre': 11, 'décembre': 12
+    }
+    # \b sur stdlib `re` (février/août/décembre finissent/contiennent des
+    # accents, invisibles au \b ASCII de re2)
+    _MOIS_RE = re.compile(r'\b(' + '|'.join(_MOIS_MAP) + r')\b')
+
+    # Mots-clés d'urgence en UNE alternation à frontières de mot: un seul
+    # scan C au lieu d'un `in` par mot-clé, et 'urgent' ne matche plus au
+    # milieu d'un mot. Stdlib `re` obligatoire: 'cassé', 'bloqué' etc. ne
+    # matcheraient jamais sous le \b ASCII de re2
+    _URG_HIGH_RE = re.compile(
+        r'\b(?:' + '|'.join(re.escape(k) for k in KEYWORDS_URGENCE_HIGH) + r')\b'
+    )
+    _URG_MEDIUM_RE = re.compile(
+        r'\b(?:' + '|'.join(re.escape(k) for k in KEYWORDS_URGENCE_MEDIUM) + r')\b'
+    )
+
+
+    def extract_ville(self, message: str, message_lower: Optional[str] = None) -> Optional[str]:
         """
         Extrait la ville mentionnée dans le message
-        
+
         Args:
             message: Message utilisateur en texte libre
-            
+            message_lower: Message déjà minusculisé (évite de refaire le
+                           .lower() quand extract_all enchaîne les extracteurs)
+
         Returns:
             Nom de la ville détectée ou None
         """
-        message_lower = message.lower()
-        
-        # Recherche directe des villes
-        for ville in self.VILLES_FRANCE:
-            # Patterns: "à Paris", "sur Lyon", "de Marseille", etc.
-            patterns = [
-                rf'\bà {ville.lower()}\b',
-                rf'\bsur {ville.lower()}\b',
-                rf'\bde {ville.lower()}\b',
-                rf'\bvers {ville.lower()}\b',
-                rf'\bpour {ville.lower()}\b',
-                rf'\b{ville.lower()}\b'
-            ]
-            
-            for pattern in patterns:
-                if re.search(pattern, message_lower):
-                    return ville
-        
+        if message_lower is None:
+            message_lower = message.lower()
+        
+        # Préfiltre: la grande majorité des messages ne mentionne aucune
+        # ville connue — un scan négatif de l'alternation coupe court sans
+        # payer l'automate ni les patterns indirects (qui ne peuvent
+        # aboutir que si une ville connue figure littéralement)
+        match_ville = self._CITY_ALTERNATION.search(message_lower)
+        if not match_ville:
+            return None
+
+        # Recherche directe des villes: un seul scan du message
+        # ("à Paris", "sur Lyon", "de Marseille", ou le nom seul)
+        if _AC_VILLES is not None:
+            ville = self._ville_via_automate(message_lower)
+            if ville:
+                return ville
+        else:
+            return self._CITY_LOWER_TO_CANONICAL[match_ville.group(1)]
+
         # Recherche indirecte par contexte
         # Mutation sur X, unité à X
-        match_mutation = re.search(r'mutation (?:sur|à|vers) (\w+)', message_lower)
+        match_mutation = self._MUTATION_RE.search(message_lower)
         if match_mutation:
-            ville_candidate = match_mutation.group(1).capitalize()
-            if ville_candidate in self.VILLES_FRANCE:
-                return ville_candidate
-        
-        match_unite = re.search(r'unité (?:de|à) (\w+)', message_lower)
+            ville_candidate = match_mutation.group(1)
+            if ville_candidate in self._VILLES_SET:
+                return self._CITY_LOWER_TO_CANONICAL[ville_candidate]
+
+        match_unite = self._UNITE_RE.search(message_lower)
         if match_unite:
-            ville_candidate = match_unite.group(1).capitalize()
-            if ville_candidate in self.VILLES_FRANCE:
-                return ville_candidate
+            ville_candidate = match_unite.group(1)
+            if ville_candidate in self._VILLES_SET:
+                return self._CITY_LOWER_TO_CANONICAL[ville_candidate]
         
         return None
     
-    def extract_temporalite(self, message: str) -> Dict[str, any]:
+    @staticmethod
+    def _ville_via_automate(message_lower: str) -> Optional[str]:
+        """
+        Scan Aho-Corasick du message (un seul passage, automate C)
+
+        L'automate matche des sous-chaînes brutes: on refiltre sur les
+        frontières de mot et on garde le match le plus à GAUCHE (le plus
+        long en cas d'égalité de position), exactement comme le .search de
+        l'alternation regex triée par longueur décroissante — les deux
+        chemins doivent retourner la même ville sur le même message.
+
+        Args:
+            message_lower: Message déjà passé en minuscules
+
+        Returns:
+            Nom canonique de la ville détectée ou None
+        """
+        best = None
+        best_start = -1
+        n = len(message_lower)
+
+        for end, ville in _AC_VILLES.iter(message_lower):
+            start = end - len(ville) + 1
+            if start > 0 and (message_lower[start - 1].isalnum() or message_lower[start - 1] == '_'):
+                continue
+            if end + 1 < n and (message_lower[end + 1].isalnum() or message_lower[end + 1] == '_'):
+                continue
+            if best is None or start < best_start or (start == best_start and len(ville) > len(best)):
+                best = ville
+                best_start = start
+
+        return best
+
+    def extract_temporalite(self, message: str, message_lower: Optional[str] = None,
+                            now: Optional[datetime] = None) -> Dict[str, any]:
         """
         Extrait la temporalité et normalise l'horizon
-        
+
         Args:
             message: Message utilisateur
-            
+            message_lower: Message déjà minusculisé (optionnel)
+            now: Date de référence (optionnel, évite de rappeler
+                 datetime.now() dans chaque branche)
+
         Returns:
             Dict avec date_detectee, horizon_temporel, jours_estimation
         """
-        message_lower = message.lower()
+        if message_lower is None:
+            message_lower = message.lower()
+        if now is None:
+            now = datetime.now()
         result = {
             'date_detectee': None,
             'horizon_temporel': None,
@@ -122,106 +392,94 @@ class NERExtractor:
         }
         
         # Détection IMMEDIATE (≤ 24h)
-        for pattern in self.PATTERNS_IMMEDIATE:
-            if re.search(pattern, message_lower):
-                result['horizon_temporel'] = 'IMMEDIATE'
-                result['jours_estimation'] = 0
-                
-                # Extraction date précise si possible
-                if 'demain' in message_lower:
-                    result['date_detectee'] = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
-                elif "aujourd'hui" in message_lower or 'ce soir' in message_lower:
-                    result['date_detectee'] = datetime.now().strftime('%Y-%m-%d')
-                elif 'après-demain' in message_lower:
-                    result['date_detectee'] = (datetime.now() + timedelta(days=2)).strftime('%Y-%m-%d')
-                
-                return result
-        
+        if self._IMMEDIATE_RE.search(message_lower):
+            result['horizon_temporel'] = 'IMMEDIATE'
+            result['jours_estimation'] = 0
+
+            # Extraction date précise si possible
+            if 'demain' in message_lower:
+                result['date_detectee'] = (now + timedelta(days=1)).strftime('%Y-%m-%d')
+            elif "aujourd'hui" in message_lower or 'ce soir' in message_lower:
+                result['date_detectee'] = now.strftime('%Y-%m-%d')
+            elif 'après-demain' in message_lower:
+                result['date_detectee'] = (now + timedelta(days=2)).strftime('%Y-%m-%d')
+
+            return result
+
         # Détection SHORT_TERM (≤ 30 jours)
-        for pattern in self.PATTERNS_SHORT_TERM:
-            match = re.search(pattern, message_lower)
-            if match:
-                result['horizon_temporel'] = 'SHORT_TERM'
-                
-                # Extraction du nombre de jours/semaines
-                nb_match = re.search(r'(\d+)\s+(jour|semaine)', match.group())
-                if nb_match:
-                    nb = int(nb_match.group(1))
-                    unite = nb_match.group(2)
-                    
-                    if unite == 'jour':
-                        result['jours_estimation'] = nb
-                    elif unite == 'semaine':
-                        result['jours_estimation'] = nb * 7
-                    
-                    result['date_detectee'] = (datetime.now() + timedelta(days=result['jours_estimation'])).strftime('%Y-%m-%d')
-                else:
-                    result['jours_estimation'] = 15  # Estimation moyenne
-                
-                return result
-        
+        match = self._SHORT_TERM_RE.search(message_lower)
+        if match:
+            result['horizon_temporel'] = 'SHORT_TERM'
+
+            # Extraction du nombre de jours/semaines
+            nb_match = self._NB_JOURS_RE.search(match.group())
+            if nb_match:
+                nb = int(nb_match.group(1))
+                unite = nb_match.group(2)
+
+                if unite == 'jour':
+                    result['jours_estimation'] = nb
+                elif unite == 'semaine':
+                    result['jours_estimation'] = nb * 7
+
+                result['date_detectee'] = (now + timedelta(days=result['jours_estimation'])).strftime('%Y-%m-%d')
+            else:
+                result['jours_estimation'] = 15  # Estimation moyenne
+
+            return result
+
         # Détection PLANNED (> 30 jours)
-        for pattern in self.PATTERNS_PLANNED:
-            match = re.search(pattern, message_lower)
-            if match:
-                result['horizon_temporel'] = 'PLANNED'
-                
-                # Extraction mois
-                nb_mois_match = re.search(r'(\d+)\s+mois', match.group())
-                if nb_mois_match:
-                    nb_mois = int(nb_mois_match.group(1))
-                    result['jours_estimation'] = nb_mois * 30
-                    result['date_detectee'] = (datetime.now() + timedelta(days=result['jours_estimation'])).strftime('%Y-%m-%d')
-                else:
-                    result['jours_estimation'] = 90  # Estimation par défaut
-                
-                # Détection de mois spécifique (septembre, mars, etc.)
-                mois_patterns = {
-                    'janvier': 1, 'février': 2, 'mars': 3, 'avril': 4,
-                    'mai': 5, 'juin': 6, 'juillet': 7, 'août': 8,
-                    'septembre': 9, 'octobre': 10, 'novembre': 11, 'décembre': 12
-                }
-                
-                for mois_nom, mois_num in mois_patterns.items():
-                    if mois_nom in message_lower:
-                        # Calculer la date approximative
-                        current_date = datetime.now()
-                        target_month = mois_num
-                        target_year = current_date.year
-                        
-                        # Si le mois est passé, prendre l'année suivante
-                        if target_month < current_date.month:
-                            target_year += 1
-                        
-                        try:
-                            target_date = datetime(target_year, target_month, 15)  # Milieu du mois
-                            result['date_detectee'] = target_date.strftime('%Y-%m-%d')
-                            result['jours_estimation'] = (target_date - current_date).days
-                        except:
-                            pass
-                        
-                        break
-                
-                return result
+        match = self._PLANNED_RE.search(message_lower)
+        if match:
+            result['horizon_temporel'] = 'PLANNED'
+
+            # Extraction mois
+            nb_mois_match = self._NB_MOIS_RE.search(match.group())
+            if nb_mois_match:
+                nb_mois = int(nb_mois_match.group(1))
+                result['jours_estimation'] = nb_mois * 30
+                result['date_detectee'] = (now + timedelta(days=result['jours_estimation'])).strftime('%Y-%m-%d')
+            else:
+                result['jours_estimation'] = 90  # Estimation par défaut
+
+            # Détection de mois spécifique (septembre, mars, etc.)
+            mois_match = self._MOIS_RE.search(message_lower)
+            if mois_match:
+                # Calculer la date approximative
+                target_month = self._MOIS_MAP[mois_match.group(1)]
+                target_year = now.year
+
+                # Si le mois est passé, prendre l'année suivante
+                if target_month < now.month:
+                    target_year += 1
+
+                # Le 15 est valide dans tous les mois: pas de garde nécessaire
+                target_date = datetime(target_year, target_month, 15)  # Milieu du mois
+                result['date_detectee'] = target_date.strftime('%Y-%m-%d')
+                result['jours_estimation'] = (target_date - now).days
+
+            return result
         
         # Si aucune temporalité explicite, déduire du contexte
-        if any(kw in message_lower for kw in self.KEYWORDS_URGENCE_HIGH):
+        if self._URG_HIGH_RE.search(message_lower):
             result['horizon_temporel'] = 'IMMEDIATE'
             result['jours_estimation'] = 0
-        elif any(kw in message_lower for kw in self.KEYWORDS_URGENCE_MEDIUM):
+        elif self._URG_MEDIUM_RE.search(message_lower):
             result['horizon_temporel'] = 'SHORT_TERM'
             result['jours_estimation'] = 7
         
         return result
     
-    def extract_urgence(self, message: str, niveau_urgence_col: Optional[str] = None) -> str:
+    def extract_urgence(self, message: str, niveau_urgence_col: Optional[str] = None,
+                        message_lower: Optional[str] = None) -> str:
         """
         Déduit le niveau d'urgence du message
-        
+
         Args:
             message: Message utilisateur
             niveau_urgence_col: Niveau d'urgence depuis la colonne CSV (si disponible)
-            
+            message_lower: Message déjà minusculisé (optionnel)
+
         Returns:
             Niveau d'urgence: IMMEDIATE, SHORT_TERM, STANDARD, PLANNED
         """
@@ -238,18 +496,19 @@ class NERExtractor:
                 return 'STANDARD'
         
         # Sinon, déduire du message
-        message_lower = message.lower()
-        
+        if message_lower is None:
+            message_lower = message.lower()
+
         # Urgence haute
-        if any(kw in message_lower for kw in self.KEYWORDS_URGENCE_HIGH):
+        if self._URG_HIGH_RE.search(message_lower):
             return 'IMMEDIATE'
-        
+
         # Urgence moyenne
-        if any(kw in message_lower for kw in self.KEYWORDS_URGENCE_MEDIUM):
+        if self._URG_MEDIUM_RE.search(message_lower):
             return 'SHORT_TERM'
         
         # Recherche patterns temporels
-        tempo_info = self.extract_temporalite(message)
+        tempo_info = self.extract_temporalite(message, message_lower)
         if tempo_info['horizon_temporel']:
             return tempo_info['horizon_temporel']
         
@@ -267,9 +526,16 @@ class NERExtractor:
         Returns:
             Dict avec toutes les entités extraites
         """
-        ville = self.extract_ville(message)
-        tempo = self.extract_temporalite(message)
-        urgence = self.extract_urgence(message, niveau_urgence_col)
+        # Minusculiser UNE fois puis propager aux trois extracteurs
+        # (le case folding Unicode coûte un parcours complet du message).
+        # NB: str.lower() reste le plus rapide ici — une table str.translate
+        # mesurée ~11x plus lente, et bytes.lower() ne replie pas les
+        # majuscules accentuées ('É' → 'é') dont dépendent les patterns
+        message_lower = message.lower()
+
+        ville = self.extract_ville(message, message_lower)
+        tempo = self.extract_temporalite(message, message_lower)
+        urgence = self.extract_urgence(message, niveau_urgence_col, message_lower)
         
         # Déterminer les contraintes de matching
         contraintes = self._determiner_contraintes(ville, tempo['horizon_temporel'], urgence)
@@ -283,37 +549,26 @@ class NERExtractor:
             'contraintes_matching': contraintes
         }
     
-    def _determiner_contraintes(self, ville: Optional[str], horizon: Optional[str], urgence: str) -> Dict[str, str]:
+    @staticmethod
+    def _determiner_contraintes(ville: Optional[str], horizon: Optional[str], urgence: str) -> Dict[str, str]:
         """
         Détermine les contraintes de matching selon les entités extraites
         
         Returns:
             Dict avec contraintes pour ville et disponibilité
         """
-        contraintes = {
-            'ville': 'FLEXIBLE',  # STRICT, PREFERRED, FLEXIBLE, NATIONAL
-            'disponibilite': 'ALL'  # 24/7, RAPIDE, SEMAINE, ALL
-        }
-        
-        # Contrainte ville
-        if ville:
-            contraintes['ville'] = 'PREFERRED'  # Match ville prioritaire mais pas bloquant
-        else:
-            contraintes['ville'] = 'NATIONAL'  # Prestataires nationaux/en ligne OK
-        
-        # Contrainte disponibilité selon urgence
-        if urgence == 'IMMEDIATE' or horizon == 'IMMEDIATE':
-            contraintes['disponibilite'] = '24/7'
-        elif urgence == 'SHORT_TERM' or horizon == 'SHORT_TERM':
-            contraintes['disponibilite'] = 'RAPIDE'
-        elif urgence == 'PLANNED' or horizon == 'PLANNED':
-            contraintes['disponibilite'] = 'ALL'
-        else:
-            contraintes['disponibilite'] = 'SEMAINE'
-        
-        return contraintes
-    
-    def is_compatible_disponibilite(self, prestataire_dispo: str, contrainte_dispo: str) -> bool:
+        # Lookup direct dans la table précalculée (contraintes possibles:
+        # ville ∈ STRICT/PREFERRED/FLEXIBLE/NATIONAL,
+        # disponibilite ∈ 24/7/RAPIDE/SEMAINE/ALL)
+        entry = _CONTRAINTES_TABLE.get((ville is not None, urgence, horizon))
+        if entry is None:
+            # Valeur hors domaine énuméré → mêmes défauts que les branches
+            entry = ('PREFERRED' if ville else 'NATIONAL', 'SEMAINE')
+
+        return {'ville': entry[0], 'disponibilite': entry[1]}
+
+    @staticmethod
+    def is_compatible_disponibilite(prestataire_dispo: str, contrainte_dispo: str) -> bool:
         """
         Vérifie si la disponibilité du prestataire est compatible
         
@@ -324,28 +579,15 @@ class NERExtractor:
         Returns:
             True si compatible, False sinon
         """
-        prestataire_lower = prestataire_dispo.lower()
-        
-        if contrainte_dispo == 'ALL':
-            return True
-        
-        if contrainte_dispo == '24/7':
-            return '24/7' in prestataire_lower or 'urgence' in prestataire_lower
-        
-        if contrainte_dispo == 'RAPIDE':
-            return ('24/7' in prestataire_lower or 
-                    'urgence' in prestataire_lower or
-                    'rapide' in prestataire_lower or
-                    'samedi' in prestataire_lower or
-                    'en ligne' in prestataire_lower)
-        
-        if contrainte_dispo == 'SEMAINE':
-            return True  # Tous compatibles
-        
-        return True
+        required = REQUIRED_DISPO_MASKS.get(contrainte_dispo)
+        if required is None:
+            return True  # Contrainte inconnue → compatible (comportement historique)
+
+        return (build_dispo_mask(prestataire_dispo) & required) != 0
     
-    def calculate_geo_score(self, ville_besoin: Optional[str], ville_prestataire: str, 
-                           impact_geo: int) -> float:
+    @staticmethod
+    def calculate_geo_score(ville_besoin: Optional[str], ville_prestataire: str,
+                            impact_geo: int) -> float:
         """
         Calcule un score géographique mathématiquement rigoureux
         
@@ -372,18 +614,12 @@ class NERExtractor:
         Returns:
             Score géographique dans [0, 1]
         """
-        # Paramètres de décroissance selon impact_geo
-        ALPHA_COEFFICIENTS = {
-            0: 0.0,      # Aucun impact → score constant = 1.0
-            1: 0.015,    # Impact modéré → 50% à 46km, 10% à 154km
-            2: 0.05,     # Impact fort → 50% à 14km, 10% à 46km
-        }
-        
         # Validation de impact_geo
-        if impact_geo not in ALPHA_COEFFICIENTS:
+        if not 0 <= impact_geo <= 2:
             raise ValueError(f"impact_geo doit être 0, 1 ou 2 (reçu: {impact_geo})")
-        
-        alpha = ALPHA_COEFFICIENTS[impact_geo]
+
+        # Indexation directe du tuple _ALPHA (pas de hash de dict par appel)
+        alpha = _ALPHA[impact_geo]
         
         # Cas 1: impact_geo = 0 → service en ligne, distance non pertinente
         if alpha == 0.0:
@@ -392,29 +628,81 @@ class NERExtractor:
         # Cas 2: Pas de ville dans le besoin → score neutre
         if not ville_besoin:
             return 0.8  # Pénalité légère pour incertitude géographique
-        
-        # Cas 3: Même ville → score maximal
-        if ville_besoin.lower().strip() == ville_prestataire.lower().strip():
-            return 1.0
-        
-        # Cas 4: Villes différentes → calcul de distance
-        distance_km = get_distance_entre_villes(ville_besoin, ville_prestataire)
-        
-        if distance_km is None:
-            # Ville non reconnue dans la base GPS → pénalité modérée
-            return 0.7
-        
-        # Formule exponentielle décroissante
-        score_geo = exp(-alpha * distance_km)
-        
-        # Garantie mathématique: score toujours dans [0, 1]
-        # (la formule garantit cela, mais on ajoute une assertion pour la sécurité)
-        assert 0.0 <= score_geo <= 1.0, f"Score hors bornes: {score_geo}"
-        
-        return score_geo
-    
-    def calculate_geo_boost(self, ville_besoin: Optional[str], ville_prestataire: str, 
-                           contrainte_ville: str) -> float:
+
+        # Cas 3 et 4: délégation au calcul memoïsé (distance + exponentielle),
+        # avec clés normalisées pour fusionner les variantes de casse/espaces
+        return _geo_score_cached(
+            ville_besoin.lower().strip(), ville_prestataire.lower().strip(), impact_geo
+        )
+
+    @staticmethod
+    def calculate_geo_scores_batch(ville_besoin: Optional[str],
+                                   villes_prestataires, impact_geo: int) -> np.ndarray:
+        """
+        Version vectorisée de calculate_geo_score sur N prestataires
+
+        Les scores ne sont calculés qu'une fois par ville UNIQUE (en
+        réutilisant le cache mémoïsé) puis redistribués sur les N lignes
+        par un gather NumPy: N appels Python deviennent U scalaires + une
+        indexation vectorisée.
+
+        Args:
+            ville_besoin: Ville détectée dans le besoin (peut être None)
+            villes_prestataires: Séquence/array des villes des prestataires
+            impact_geo: Niveau d'impact géographique (0, 1, ou 2)
+
+        Returns:
+            numpy.ndarray de scores dans [0, 1], aligné sur l'entrée
+        """
+        if not 0 <= impact_geo <= 2:
+            raise ValueError(f"impact_geo doit être 0, 1 ou 2 (reçu: {impact_geo})")
+
+        villes = np.asarray(villes_prestataires, dtype=str)
+        alpha = _ALPHA[impact_geo]
+
+        if alpha == 0.0:
+            return np.ones(len(villes))
+
+        if not ville_besoin:
+            return np.full(len(villes), 0.8)
+
+        uniques, inverse = np.unique(villes, return_inverse=True)
+        besoin_norm = ville_besoin.lower().strip()
+        i_besoin = _CITY_INDEX.get(besoin_norm)
+
+        # Distances des villes uniques (NaN = ville inconnue de la base),
+        # lues dans la matrice précalculée quand les deux villes y figurent
+        distances = np.empty(len(uniques), dtype=np.float64)
+        for k, ville in enumerate(uniques):
+            ville_norm = ville.lower().strip()
+            if ville_norm == besoin_norm:
+                distances[k] = 0.0
+                continue
+            j = _CITY_INDEX.get(ville_norm)
+            if i_besoin is not None and j is not None:
+                distances[k] = _DIST_MATRIX[i_besoin, j]
+            else:
+                d = get_distance_entre_villes(besoin_norm, ville_norm)
+                distances[k] = np.nan if d is None else d
+
+        # Villes hors base GPS (distance NaN) → score neutre 0.7, masqué
+        # AVANT le noyau: sous fastmath Numba élimine les tests NaN, le
+        # repli doit donc vivre côté NumPy
+        unknown = np.isnan(distances)
+        if unknown.any():
+            distances[unknown] = 0.0
+
+        # Noyau exp(-alpha * d) compilé Numba quand disponible
+        scores_uniques = np.empty_like(distances)
+        _geo_scores_kernel(distances, alpha, scores_uniques)
+        scores_uniques[unknown] = 0.7
+
+        return scores_uniques[inverse]
+
+
+    @staticmethod
+    def calculate_geo_boost(ville_besoin: Optional[str], ville_prestataire: str,
+                            contrainte_ville: str) -> float:
         """
         ANCIENNE VERSION - Conservée pour compatibilité ascendante
         
@@ -436,3 +724,38 @@ class NERExtractor:
             return 1.1 if ville_match else 1.0
         else:  # NATIONAL
             return 1.0
+
+
+# Matrice des distances villes×villes précalculée à l'import depuis la base
+# GPS hardcodée (29×29 en float32 ≈ 3,4 Ko, tient en cache L1): un simple
+# load remplace l'appel get_distance_entre_villes dans la boucle de matching
+_CITY_INDEX = {ville: i for i, ville in enumerate(NERExtractor._VILLES_FRANCE_LOWER)}
+_coords_rad = np.radians(np.array(
+    [COORDONNEES_VILLES[ville] for ville in NERExtractor.VILLES_FRANCE],
+    dtype=np.float64
+))
+_DIST_MATRIX = haversine_pairwise(
+    _coords_rad[:, None, 0], _coords_rad[:, None, 1],
+    _coords_rad[None, :, 0], _coords_rad[None, :, 1],
+).astype(np.float32)
+del _coords_rad
+
+# Scores géographiques précalculés pour chaque impact_geo: sur les villes
+# de la base, l'exponentielle disparaît du chemin chaud au profit d'une
+# simple indexation (impact_geo, i, j)
+_GEO_SCORES = np.exp(
+    -np.asarray(_ALPHA, dtype=np.float32)[:, None, None] * _DIST_MATRIX
+)
+_GEO_SCORES[0, :, :] = 1.0
+
+
+# Automate Aho-Corasick des villes, construit une fois à l'import
+# (None si pyahocorasick est absent → fallback sur l'alternation regex)
+if AHOCORASICK_AVAILABLE:
+    _AC_VILLES = ahocorasick.Automaton()
+    for _ville, _ville_lower in zip(NERExtractor.VILLES_FRANCE,
+                                    NERExtractor._VILLES_FRANCE_LOWER):
+        _AC_VILLES.add_word(_ville_lower, _ville)
+    _AC_VILLES.make_automaton()
+else:
+    _AC_VILLES = None